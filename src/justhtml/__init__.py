@@ -1,5 +1,6 @@
-from .parser import JustHTML, StrictModeError
-from .selector import SelectorError, matches, query
+from .errors import StrictModeError
+from .parser import JustHTML
+from .selector import SelectorError, SelectorIndex, matches, query
 from .serialize import to_html, to_test_format
 from .stream import stream
 from .tokens import ParseError
@@ -8,6 +9,7 @@ __all__ = [
     "JustHTML",
     "ParseError",
     "SelectorError",
+    "SelectorIndex",
     "StrictModeError",
     "matches",
     "query",
@@ -9,7 +9,8 @@ from importlib.metadata import PackageNotFoundError, version
 from pathlib import Path
 
 from . import JustHTML
-from .selector import SelectorError
+from .encoding import decode_html, normalize_encoding_label
+from .selector import SelectorError, parse_selector
 
 
 def _get_version() -> str:
@@ -52,6 +53,10 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
         default="html",
         help="Output format (default: html)",
     )
+    parser.add_argument(
+        "--encoding",
+        help="Input encoding to use instead of sniffing it from the document (e.g. utf-8)",
+    )
     parser.add_argument(
         "--first",
         action="store_true",
@@ -92,16 +97,34 @@ def _parse_args(argv: list[str]) -> argparse.Namespace:
     return args
 
 
-def _read_html(path: str) -> str:
-    if path == "-":
-        return sys.stdin.read()
+def _decode_input(data: bytes, encoding: str | None) -> str:
+    # Sniff a BOM or meta charset, but treat undeclared input as UTF-8 rather
+    # than the browser default of windows-1252.
+    return decode_html(data, transport_encoding=encoding, default_encoding="utf-8")[0]
+
 
-    return Path(path).read_text()
+def _read_html(path: str, encoding: str | None) -> str:
+    data = sys.stdin.buffer.read() if path == "-" else Path(path).read_bytes()
+    return _decode_input(data, encoding)
 
 
 def main() -> None:
     args = _parse_args(sys.argv[1:])
-    html = _read_html(args.path)
+
+    if args.selector:
+        # Reject invalid selectors before reading any input. Parsed selectors
+        # are cached, so the query below reuses this parse.
+        try:
+            parse_selector(args.selector)
+        except SelectorError as e:
+            print(str(e), file=sys.stderr)
+            raise SystemExit(2) from e
+
+    if args.encoding is not None and normalize_encoding_label(args.encoding) is None:
+        print(f"Unsupported encoding: {args.encoding}", file=sys.stderr)
+        raise SystemExit(2)
+
+    html = _read_html(args.path, args.encoding)
     doc = JustHTML(html)
 
     try:
@@ -118,19 +141,16 @@ def main() -> None:
 
     if args.format == "html":
         outputs = [node.to_html() for node in nodes]
-        sys.stdout.write("\n".join(outputs))
-        sys.stdout.write("\n")
+        sys.stdout.write("\n".join(outputs) + "\n")
         return
 
     if args.format == "text":
         outputs = [node.to_text(separator=args.separator, strip=args.strip) for node in nodes]
-        sys.stdout.write("\n".join(outputs))
-        sys.stdout.write("\n")
+        sys.stdout.write("\n".join(outputs) + "\n")
         return
 
     outputs = [node.to_markdown() for node in nodes]
-    sys.stdout.write("\n\n".join(outputs))
-    sys.stdout.write("\n")
+    sys.stdout.write("\n\n".join(outputs) + "\n")
     return
 
 
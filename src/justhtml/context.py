@@ -1,12 +1,27 @@
 from __future__ import annotations
 
+from sys import intern
+
 
 class FragmentContext:
-    __slots__ = ("namespace", "tag_name")
+    __slots__ = ("_tag_name", "namespace", "tag_name_lower")
 
-    tag_name: str
+    _tag_name: str
     namespace: str | None
+    # Lowercased, interned tag_name, computed once so parsers don't redo it.
+    tag_name_lower: str
 
     def __init__(self, tag_name: str, namespace: str | None = None) -> None:
         self.tag_name = tag_name
         self.namespace = namespace
+
+    @property
+    def tag_name(self) -> str:
+        return self._tag_name
+
+    @tag_name.setter
+    def tag_name(self, tag_name: str) -> None:
+        # Keep tag_name_lower in step when the name is reassigned
+        self._tag_name = tag_name
+        name = tag_name or ""
+        self.tag_name_lower = intern(name if name.islower() else name.lower())
@@ -9,7 +9,40 @@ Outputs are a decoded Unicode string and the chosen encoding name.
 
 from __future__ import annotations
 
-_ASCII_WHITESPACE: set[int] = {0x09, 0x0A, 0x0C, 0x0D, 0x20}
+import codecs
+import re
+from functools import lru_cache
+
+_ASCII_WHITESPACE: bytes = b"\t\n\x0c\r "
+
+
+def _windows_1252_c1_fallback(exc: UnicodeError) -> tuple[str, int]:
+    # Python's cp1252 leaves 0x81, 0x8D, 0x8F, 0x90 and 0x9D undefined, but the
+    # WHATWG windows-1252 decoder maps them to the matching C1 control code points.
+    if not isinstance(exc, UnicodeDecodeError):  # pragma: no cover
+        raise exc
+    return "".join(map(chr, exc.object[exc.start : exc.end])), exc.end
+
+
+_WINDOWS_1252_ERRORS = "justhtml.windows-1252"
+codecs.register_error(_WINDOWS_1252_ERRORS, _windows_1252_c1_fallback)
+
+# Bytes that matter while skipping over a tag: quotes and the closing '>'.
+_TAG_SKIP_RE: re.Pattern[bytes] = re.compile(rb"[\"'>]")
+
+# One meta tag attribute: a name, then optionally '=' and a double-quoted,
+# single-quoted, or unquoted value. A quote with no closing partner matches
+# the "unclosed" group so the caller can drop the whole tag.
+_META_ATTR_RE: re.Pattern[bytes] = re.compile(
+    rb"""(?P<name>[^\t\n\f\r /=><]*)[\t\n\f\r ]*"""
+    rb"""(?:=[\t\n\f\r ]*(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|(?P<unclosed>["'])|(?P<bare>[^\t\n\f\r ><]*)))?"""
+)
+
+# The "=value" following "charset" in a normalized (lowercased, whitespace
+# folded to spaces) meta content value. A value must follow the '='.
+_CHARSET_VALUE_RE: re.Pattern[bytes] = re.compile(
+    rb"""[ ]*=[ ]*(?=[^ ])(?:"(?P<dq>[^"]*)"|'(?P<sq>[^']*)'|["']|(?P<bare>[^ ;]*))"""
+)
 
 
 def _ascii_lower(b: int) -> int:
@@ -19,30 +52,57 @@ def _ascii_lower(b: int) -> int:
     return b
 
 
-def _is_ascii_alpha(b: int) -> bool:
-    b = _ascii_lower(b)
-    return 0x61 <= b <= 0x7A
+# Translation table mapping ASCII whitespace to space and ASCII uppercase to lowercase.
+_LOWER_WS_TABLE: bytes = bytes(0x20 if c in _ASCII_WHITESPACE else _ascii_lower(c) for c in range(256))
 
 
-def _skip_ascii_whitespace(data: bytes, i: int) -> int:
-    n = len(data)
-    while i < n and data[i] in _ASCII_WHITESPACE:
-        i += 1
-    return i
+# Byte classification tables, indexed by byte value (nonzero means a member).
+_IS_ASCII_WHITESPACE: bytes = bytes(c in _ASCII_WHITESPACE for c in range(256))
+_IS_ASCII_ALPHA: bytes = bytes(0x61 <= _ascii_lower(c) <= 0x7A for c in range(256))
 
 
 def _strip_ascii_whitespace(value: bytes | None) -> bytes | None:
     if value is None:
         return None
-    start = 0
-    end = len(value)
-    while start < end and value[start] in _ASCII_WHITESPACE:
-        start += 1
-    while end > start and value[end - 1] in _ASCII_WHITESPACE:
-        end -= 1
-    return value[start:end]
+    return value.strip(_ASCII_WHITESPACE)
 
 
+# Accepted encoding labels mapped to the canonical name used for decoding.
+_ENCODING_ALIASES: dict[str, str] = {
+    # Security: never allow utf-7.
+    "utf-7": "windows-1252",
+    "utf7": "windows-1252",
+    "x-utf-7": "windows-1252",
+    "utf-8": "utf-8",
+    "utf8": "utf-8",
+    # HTML treats latin-1 labels as windows-1252.
+    "iso-8859-1": "windows-1252",
+    "iso8859-1": "windows-1252",
+    "latin1": "windows-1252",
+    "latin-1": "windows-1252",
+    "l1": "windows-1252",
+    "cp819": "windows-1252",
+    "ibm819": "windows-1252",
+    "windows-1252": "windows-1252",
+    "windows1252": "windows-1252",
+    "cp1252": "windows-1252",
+    "x-cp1252": "windows-1252",
+    "iso-8859-2": "iso-8859-2",
+    "iso8859-2": "iso-8859-2",
+    "latin2": "iso-8859-2",
+    "latin-2": "iso-8859-2",
+    "euc-jp": "euc-jp",
+    "eucjp": "euc-jp",
+    "utf-16": "utf-16",
+    "utf16": "utf-16",
+    "utf-16le": "utf-16le",
+    "utf16le": "utf-16le",
+    "utf-16be": "utf-16be",
+    "utf16be": "utf-16be",
+}
+
+
+@lru_cache(maxsize=256)
 def normalize_encoding_label(label: str | bytes | None) -> str | None:
     if not label:
         return None
@@ -54,44 +114,27 @@ def normalize_encoding_label(label: str | bytes | None) -> str | None:
     if not s:
         return None
 
-    s = s.lower()
+    return _ENCODING_ALIASES.get(s.lower())
 
-    # Security: never allow utf-7.
-    if s in {"utf-7", "utf7", "x-utf-7"}:
-        return "windows-1252"
-
-    if s in {"utf-8", "utf8"}:
-        return "utf-8"
 
-    # HTML treats latin-1 labels as windows-1252.
-    if s in {
-        "iso-8859-1",
-        "iso8859-1",
-        "latin1",
-        "latin-1",
-        "l1",
-        "cp819",
-        "ibm819",
-    }:
-        return "windows-1252"
-
-    if s in {"windows-1252", "windows1252", "cp1252", "x-cp1252"}:
-        return "windows-1252"
-
-    if s in {"iso-8859-2", "iso8859-2", "latin2", "latin-2"}:
-        return "iso-8859-2"
-
-    if s in {"euc-jp", "eucjp"}:
-        return "euc-jp"
-
-    if s in {"utf-16", "utf16"}:
-        return "utf-16"
-    if s in {"utf-16le", "utf16le"}:
-        return "utf-16le"
-    if s in {"utf-16be", "utf16be"}:
-        return "utf-16be"
+def _skip_tag(data: bytes | bytearray, i: int, limit: int) -> int:
+    """Return the index just past the '>' closing the tag at i, or limit.
 
-    return None
+    Quoted sections are skipped so a '>' inside an attribute value does not
+    end the tag. Scanning uses C-level searches instead of a per-byte loop.
+    """
+    k = i
+    while True:
+        m = _TAG_SKIP_RE.search(data, k, limit)
+        if m is None:
+            return limit
+        k = m.start()
+        if data[k] == 0x3E:  # '>'
+            return k + 1
+        end = data.find(data[k : k + 1], k + 1, limit)
+        if end == -1:
+            return limit
+        k = end + 1
 
 
 def _normalize_meta_declared_encoding(label: bytes | None) -> str | None:
@@ -107,7 +150,7 @@ def _normalize_meta_declared_encoding(label: bytes | None) -> str | None:
     return enc
 
 
-def _sniff_bom(data: bytes) -> tuple[str | None, int]:
+def _sniff_bom(data: bytes | bytearray) -> tuple[str | None, int]:
     if len(data) >= 3 and data[0:3] == b"\xef\xbb\xbf":
         return "utf-8", 3
     if len(data) >= 2 and data[0:2] == b"\xff\xfe":
@@ -117,62 +160,40 @@ def _sniff_bom(data: bytes) -> tuple[str | None, int]:
     return None, 0
 
 
+@lru_cache(maxsize=256)
 def _extract_charset_from_content(content_bytes: bytes) -> bytes | None:
     if not content_bytes:
         return None
 
     # Normalize whitespace to spaces for robust matching.
-    b = bytearray()
-    for ch in content_bytes:
-        if ch in _ASCII_WHITESPACE:
-            b.append(0x20)
-        else:
-            b.append(_ascii_lower(ch))
-    s = bytes(b)
+    s = content_bytes.translate(_LOWER_WS_TABLE)
 
     idx = s.find(b"charset")
     if idx == -1:
         return None
 
-    i = idx + len(b"charset")
-    n = len(s)
-    while i < n and s[i] in _ASCII_WHITESPACE:
-        i += 1
-    if i >= n or s[i] != 0x3D:  # '='
-        return None
-    i += 1
-    while i < n and s[i] in _ASCII_WHITESPACE:
-        i += 1
-    if i >= n:
+    m = _CHARSET_VALUE_RE.match(s, idx + len(b"charset"))
+    if m is None:
         return None
 
-    quote: int | None = None
-    if s[i] in (0x22, 0x27):  # '"' or "'"
-        quote = s[i]
-        i += 1
-
-    start = i
-    while i < n:
-        ch = s[i]
-        if quote is not None:
-            if ch == quote:
-                break
-        else:
-            if ch in _ASCII_WHITESPACE or ch == 0x3B:  # ';'
-                break
-        i += 1
+    # An unclosed quote matches none of the value groups.
+    dq, sq, bare = m.groups()
+    if dq is not None:
+        return dq
+    if sq is not None:
+        return sq
+    return bare
 
-    if quote is not None and (i >= n or s[i] != quote):
-        return None
 
-    return s[start:i]
+# Hard cap on how far the meta prescan looks, however long the comments are.
+_PRESCAN_MAX_TOTAL_SCAN = 65536
 
 
-def _prescan_for_meta_charset(data: bytes) -> str | None:
+def _prescan_for_meta_charset(data: bytes | bytearray) -> str | None:
     # Scan up to 1024 bytes worth of non-comment input, but allow skipping
     # arbitrarily large comments (bounded by a hard cap).
     max_non_comment = 1024
-    max_total_scan = 65536
+    max_total_scan = _PRESCAN_MAX_TOTAL_SCAN
 
     n = len(data)
     i = 0
@@ -180,9 +201,13 @@ def _prescan_for_meta_charset(data: bytes) -> str | None:
 
     while i < n and i < max_total_scan and non_comment < max_non_comment:
         if data[i] != 0x3C:  # '<'
-            i += 1
-            non_comment += 1
-            continue
+            # Jump straight to the next '<' within the remaining scan budget.
+            limit = min(n, max_total_scan, i + max_non_comment - non_comment)
+            lt = data.find(b"<", i, limit)
+            if lt == -1:
+                return None
+            non_comment += lt - i
+            i = lt
 
         # Comment
         if i + 3 < n and data[i + 1 : i + 4] == b"!--":
@@ -196,54 +221,33 @@ def _prescan_for_meta_charset(data: bytes) -> str | None:
         j = i + 1
         if j < n and data[j] == 0x2F:  # '/'
             # Skip end tag.
-            k = i
-            quote: int | None = None
-            while k < n and k < max_total_scan and non_comment < max_non_comment:
-                ch = data[k]
-                if quote is None:
-                    if ch in (0x22, 0x27):
-                        quote = ch
-                    elif ch == 0x3E:  # '>'
-                        k += 1
-                        non_comment += 1
-                        break
-                else:
-                    if ch == quote:
-                        quote = None
-                k += 1
-                non_comment += 1
+            k = _skip_tag(data, i, min(n, max_total_scan, i + max_non_comment - non_comment))
+            non_comment += k - i
             i = k
             continue
 
-        if j >= n or not _is_ascii_alpha(data[j]):
+        if j >= n or not _IS_ASCII_ALPHA[data[j]]:
             i += 1
             non_comment += 1
             continue
 
         name_start = j
-        while j < n and _is_ascii_alpha(data[j]):
+        while j < n and _IS_ASCII_ALPHA[data[j]]:
             j += 1
 
-        tag_name = data[name_start:j]
-        if tag_name.lower() != b"meta":
+        # Compare against "meta" in place (ASCII letters lowercase with | 0x20)
+        # rather than slicing and lowercasing every tag name.
+        if (
+            j - name_start != 4
+            or data[name_start] | 0x20 != 0x6D  # 'm'
+            or data[name_start + 1] | 0x20 != 0x65  # 'e'
+            or data[name_start + 2] | 0x20 != 0x74  # 't'
+            or data[name_start + 3] | 0x20 != 0x61  # 'a'
+        ):
             # Skip the rest of this tag so we don't accidentally interpret '<'
             # inside an attribute value as a new tag.
-            k = i
-            quote = None
-            while k < n and k < max_total_scan and non_comment < max_non_comment:
-                ch = data[k]
-                if quote is None:
-                    if ch in (0x22, 0x27):
-                        quote = ch
-                    elif ch == 0x3E:  # '>'
-                        k += 1
-                        non_comment += 1
-                        break
-                else:
-                    if ch == quote:
-                        quote = None
-                k += 1
-                non_comment += 1
+            k = _skip_tag(data, i, min(n, max_total_scan, i + max_non_comment - non_comment))
+            non_comment += k - i
             i = k
             continue
 
@@ -265,52 +269,34 @@ def _prescan_for_meta_charset(data: bytes) -> str | None:
             if ch == 0x3C:  # '<' - restart scanning from here
                 break
 
-            if ch in _ASCII_WHITESPACE or ch == 0x2F:  # '/'
+            if _IS_ASCII_WHITESPACE[ch] or ch == 0x2F:  # '/'
                 k += 1
                 continue
 
-            # Attribute name
-            attr_start = k
-            while k < n:
-                ch = data[k]
-                if ch in _ASCII_WHITESPACE or ch in {0x3D, 0x3E, 0x2F, 0x3C}:
-                    break
-                k += 1
-            attr_name = data[attr_start:k].lower()
-            k = _skip_ascii_whitespace(data, k)
+            # Attribute name and optional value, matched in one regex pass.
+            m = _META_ATTR_RE.match(data, k)
+            assert m is not None  # noqa: S101  # Every part of the pattern is optional.
+            kind = m.lastgroup
+            if kind == "unclosed":
+                # Unclosed quote: ignore this meta.
+                i += 1
+                non_comment += 1
+                charset = None
+                http_equiv = None
+                content = None
+                saw_gt = False
+                break
+            k = m.end()
 
+            # Only charset/content (7 bytes) and http-equiv (10 bytes) matter,
+            # so don't build the name or value bytes for any other attribute.
+            name_len = m.end("name") - m.start("name")
+            if name_len != 7 and name_len != 10:
+                continue
+            attr_name = m["name"].lower()
             value: bytes | None = None
-            if k < n and data[k] == 0x3D:  # '='
-                k += 1
-                k = _skip_ascii_whitespace(data, k)
-                if k >= n:
-                    break
-
-                quote = None
-                if data[k] in (0x22, 0x27):
-                    quote = data[k]
-                    k += 1
-                    val_start = k
-                    end_quote = data.find(bytes((quote,)), k)
-                    if end_quote == -1:
-                        # Unclosed quote: ignore this meta.
-                        i += 1
-                        non_comment += 1
-                        charset = None
-                        http_equiv = None
-                        content = None
-                        saw_gt = False
-                        break
-                    value = data[val_start:end_quote]
-                    k = end_quote + 1
-                else:
-                    val_start = k
-                    while k < n:
-                        ch = data[k]
-                        if ch in _ASCII_WHITESPACE or ch in {0x3E, 0x3C}:
-                            break
-                        k += 1
-                    value = data[val_start:k]
+            if kind is not None and kind != "name":
+                value = m[kind]
 
             if attr_name == b"charset":
                 charset = _strip_ascii_whitespace(value)
@@ -344,12 +330,28 @@ def _prescan_for_meta_charset(data: bytes) -> str | None:
     return None
 
 
-def sniff_html_encoding(data: bytes, transport_encoding: str | None = None) -> tuple[str, int]:
+def _as_byte_view(data: memoryview) -> memoryview:
+    if not data.c_contiguous:
+        return memoryview(data.tobytes())
+    if data.format != "B" or data.ndim != 1:
+        return data.cast("B")
+    return data
+
+
+def sniff_html_encoding(
+    data: bytes | bytearray | memoryview,
+    transport_encoding: str | None = None,
+    default_encoding: str = "windows-1252",
+) -> tuple[str, int]:
     # Transport overrides everything.
     transport = normalize_encoding_label(transport_encoding)
     if transport:
         return transport, 0
 
+    if isinstance(data, memoryview):
+        # memoryview has no find(), so sniff from a bytes copy of the prescan window.
+        data = _as_byte_view(data)[:_PRESCAN_MAX_TOTAL_SCAN].tobytes()
+
     bom_enc, bom_len = _sniff_bom(data)
     if bom_enc:
         return bom_enc, bom_len
@@ -358,15 +360,28 @@ def sniff_html_encoding(data: bytes, transport_encoding: str | None = None) -> t
     if meta_enc:
         return meta_enc, 0
 
-    return "windows-1252", 0
+    return default_encoding, 0
+
+
+_ASCII_COMPATIBLE_ENCODINGS: frozenset[str] = frozenset({"utf-8", "windows-1252", "iso-8859-2", "euc-jp"})
 
 
-def decode_html(data: bytes, transport_encoding: str | None = None) -> tuple[str, str]:
+def decode_html(
+    data: bytes | bytearray | memoryview,
+    transport_encoding: str | None = None,
+    default_encoding: str = "windows-1252",
+) -> tuple[str, str]:
     """Decode an HTML byte stream using HTML encoding sniffing.
 
+    Buffer inputs (bytearray, memoryview) are decoded in place rather than
+    copied to bytes first. `default_encoding` is used when there is no
+    transport encoding, BOM, or meta charset.
+
     Returns (text, encoding_name).
     """
-    enc, bom_len = sniff_html_encoding(data, transport_encoding=transport_encoding)
+    if isinstance(data, memoryview):
+        data = _as_byte_view(data)
+    enc, bom_len = sniff_html_encoding(data, transport_encoding=transport_encoding, default_encoding=default_encoding)
 
     # Allowlist supported decoders.
     if enc not in {
@@ -381,25 +396,31 @@ def decode_html(data: bytes, transport_encoding: str | None = None) -> tuple[str
         enc = "windows-1252"
         bom_len = 0
 
-    payload = data[bom_len:] if bom_len else data
+    # str() decodes any buffer, and slicing a memoryview skips the BOM without a copy.
+    payload = memoryview(data)[bom_len:] if bom_len else data
+
+    # Pure-ASCII input decodes identically under every ASCII-compatible encoding,
+    # and the ASCII codec is far faster than the charmap ones (e.g. cp1252).
+    if enc in _ASCII_COMPATIBLE_ENCODINGS and not isinstance(payload, memoryview) and payload.isascii():
+        return str(payload, "ascii"), enc
 
     if enc == "windows-1252":
-        return payload.decode("cp1252"), "windows-1252"
+        return str(payload, "cp1252", _WINDOWS_1252_ERRORS), "windows-1252"
 
     if enc == "iso-8859-2":
-        return payload.decode("iso-8859-2", "replace"), "iso-8859-2"
+        return str(payload, "iso-8859-2", "replace"), "iso-8859-2"
 
     if enc == "euc-jp":
-        return payload.decode("euc_jp", "replace"), "euc-jp"
+        return str(payload, "euc_jp", "replace"), "euc-jp"
 
     if enc == "utf-16le":
-        return payload.decode("utf-16le", "replace"), "utf-16le"
+        return str(payload, "utf-16le", "replace"), "utf-16le"
 
     if enc == "utf-16be":
-        return payload.decode("utf-16be", "replace"), "utf-16be"
+        return str(payload, "utf-16be", "replace"), "utf-16be"
 
     if enc == "utf-16":
-        return payload.decode("utf-16", "replace"), "utf-16"
+        return str(payload, "utf-16", "replace"), "utf-16"
 
     # Default utf-8
-    return payload.decode("utf-8", "replace"), "utf-8"
+    return str(payload, "utf-8", "replace"), "utf-8"
@@ -7,133 +7,151 @@ Supports both named entities (&amp;, &nbsp;) and numeric references (&#60;, &#x3
 from __future__ import annotations
 
 import html.entities
+import re
+from typing import Any
 
-# Use Python's complete HTML5 entity list (2231 entities)
-# Keys include the trailing semicolon (e.g., "amp;", "lang;")
-# We'll strip semicolons when looking up to match both forms
-_HTML5_ENTITIES: dict[str, str] = html.entities.html5
-
-# Build a normalized lookup without semicolons for easier access
-NAMED_ENTITIES: dict[str, str] = {}
-for _key, _value in _HTML5_ENTITIES.items():
-    # Remove trailing semicolon for lookup
-    if _key.endswith(";"):
-        NAMED_ENTITIES[_key[:-1]] = _value
-    else:
-        NAMED_ENTITIES[_key] = _value
+# Python's complete HTML5 entity list (2231 entities) has keys that include
+# the trailing semicolon (e.g., "amp;", "lang;"). Build a normalized lookup
+# without semicolons so both forms can be matched.
+NAMED_ENTITIES: dict[str, str] = {key.removesuffix(";"): value for key, value in html.entities.html5.items()}
 
 # Legacy named character references that can be used without semicolons
 # Per HTML5 spec, these are primarily ISO-8859-1 (Latin-1) entities from HTML4
 # Modern entities like "prod", "notin" etc. require semicolons
 # Note: Some have both uppercase and lowercase versions (e.g., COPY/copy, GT/gt)
-LEGACY_ENTITIES: set[str] = {
-    "gt",
-    "lt",
-    "amp",
-    "quot",
-    "nbsp",
-    "AMP",
-    "QUOT",
-    "GT",
-    "LT",
-    "COPY",
-    "REG",
-    "AElig",
-    "Aacute",
-    "Acirc",
-    "Agrave",
-    "Aring",
-    "Atilde",
-    "Auml",
-    "Ccedil",
-    "ETH",
-    "Eacute",
-    "Ecirc",
-    "Egrave",
-    "Euml",
-    "Iacute",
-    "Icirc",
-    "Igrave",
-    "Iuml",
-    "Ntilde",
-    "Oacute",
-    "Ocirc",
-    "Ograve",
-    "Oslash",
-    "Otilde",
-    "Ouml",
-    "THORN",
-    "Uacute",
-    "Ucirc",
-    "Ugrave",
-    "Uuml",
-    "Yacute",
-    "aacute",
-    "acirc",
-    "acute",
-    "aelig",
-    "agrave",
-    "aring",
-    "atilde",
-    "auml",
-    "brvbar",
-    "ccedil",
-    "cedil",
-    "cent",
-    "copy",
-    "curren",
-    "deg",
-    "divide",
-    "eacute",
-    "ecirc",
-    "egrave",
-    "eth",
-    "euml",
-    "frac12",
-    "frac14",
-    "frac34",
-    "iacute",
-    "icirc",
-    "iexcl",
-    "igrave",
-    "iquest",
-    "iuml",
-    "laquo",
-    "macr",
-    "micro",
-    "middot",
-    "not",
-    "ntilde",
-    "oacute",
-    "ocirc",
-    "ograve",
-    "ordf",
-    "ordm",
-    "oslash",
-    "otilde",
-    "ouml",
-    "para",
-    "plusmn",
-    "pound",
-    "raquo",
-    "reg",
-    "sect",
-    "shy",
-    "sup1",
-    "sup2",
-    "sup3",
-    "szlig",
-    "thorn",
-    "times",
-    "uacute",
-    "ucirc",
-    "ugrave",
-    "uml",
-    "uuml",
-    "yacute",
-    "yen",
-    "yuml",
-}
+LEGACY_ENTITIES: frozenset[str] = frozenset(
+    {
+        "gt",
+        "lt",
+        "amp",
+        "quot",
+        "nbsp",
+        "AMP",
+        "QUOT",
+        "GT",
+        "LT",
+        "COPY",
+        "REG",
+        "AElig",
+        "Aacute",
+        "Acirc",
+        "Agrave",
+        "Aring",
+        "Atilde",
+        "Auml",
+        "Ccedil",
+        "ETH",
+        "Eacute",
+        "Ecirc",
+        "Egrave",
+        "Euml",
+        "Iacute",
+        "Icirc",
+        "Igrave",
+        "Iuml",
+        "Ntilde",
+        "Oacute",
+        "Ocirc",
+        "Ograve",
+        "Oslash",
+        "Otilde",
+        "Ouml",
+        "THORN",
+        "Uacute",
+        "Ucirc",
+        "Ugrave",
+        "Uuml",
+        "Yacute",
+        "aacute",
+        "acirc",
+        "acute",
+        "aelig",
+        "agrave",
+        "aring",
+        "atilde",
+        "auml",
+        "brvbar",
+        "ccedil",
+        "cedil",
+        "cent",
+        "copy",
+        "curren",
+        "deg",
+        "divide",
+        "eacute",
+        "ecirc",
+        "egrave",
+        "eth",
+        "euml",
+        "frac12",
+        "frac14",
+        "frac34",
+        "iacute",
+        "icirc",
+        "iexcl",
+        "igrave",
+        "iquest",
+        "iuml",
+        "laquo",
+        "macr",
+        "micro",
+        "middot",
+        "not",
+        "ntilde",
+        "oacute",
+        "ocirc",
+        "ograve",
+        "ordf",
+        "ordm",
+        "oslash",
+        "otilde",
+        "ouml",
+        "para",
+        "plusmn",
+        "pound",
+        "raquo",
+        "reg",
+        "sect",
+        "shy",
+        "sup1",
+        "sup2",
+        "sup3",
+        "szlig",
+        "thorn",
+        "times",
+        "uacute",
+        "ucirc",
+        "ugrave",
+        "uml",
+        "uuml",
+        "yacute",
+        "yen",
+        "yuml",
+    }
+)
+
+# Legacy entity name -> decoded value, for the no-semicolon and prefix lookups
+_LEGACY_NAMED: dict[str, str] = {name: NAMED_ENTITIES[name] for name in LEGACY_ENTITIES if name in NAMED_ENTITIES}
+
+
+def _build_legacy_trie() -> dict[str, Any]:
+    # Nested dicts keyed by character; the "" key holds the decoded value
+    # of a legacy name that ends at that node.
+    trie: dict[str, Any] = {}
+    for name, value in _LEGACY_NAMED.items():
+        node = trie
+        for ch in name:
+            node = node.setdefault(ch, {})
+        node[""] = value
+    return trie
+
+
+# Trie of legacy names, for longest-prefix matching in a single pass
+_LEGACY_TRIE: dict[str, Any] = _build_legacy_trie()
+
+# Complete "&name;" references -> decoded value, so the common case is one
+# lookup on the matched text
+_NAMED_REFERENCES: dict[str, str] = {f"&{name};": value for name, value in NAMED_ENTITIES.items()}
 
 # HTML5 numeric character reference replacements (§13.2.5.73)
 NUMERIC_REPLACEMENTS: dict[int, str] = {
@@ -168,32 +186,87 @@ NUMERIC_REPLACEMENTS: dict[int, str] = {
 }
 
 
-def decode_numeric_entity(text: str, is_hex: bool = False) -> str:
-    """Decode a numeric character reference like &#60; or &#x3C;.
+def decode_numeric_entity(codepoint: int) -> str:
+    """Decode the codepoint of a numeric character reference like &#60; or &#x3C;.
 
     Args:
-        text: The numeric part (without &# or ;)
-        is_hex: Whether this is hexadecimal (&#x) or decimal (&#)
+        codepoint: The already-parsed numeric value of the reference
 
     Returns:
-        The decoded character, or None if invalid
+        The decoded character, with HTML5 replacements applied
     """
-    base = 16 if is_hex else 10
-    codepoint = int(text, base)
-
     # Apply HTML5 replacements for certain ranges
-    if codepoint in NUMERIC_REPLACEMENTS:
-        return NUMERIC_REPLACEMENTS[codepoint]
+    replacement = NUMERIC_REPLACEMENTS.get(codepoint)
+    if replacement is not None:
+        return replacement
 
     # Invalid ranges per HTML5 spec
     if codepoint > 0x10FFFF:
         return "\ufffd"  # REPLACEMENT CHARACTER
-    if 0xD800 <= codepoint <= 0xDFFF:  # Surrogate range
+    if (codepoint & ~0x7FF) == 0xD800:  # Surrogate range 0xD800-0xDFFF
         return "\ufffd"
 
     return chr(codepoint)
 
 
+# A character reference: hex digits, decimal digits, or an alphanumeric name
+# (any of which may be empty), followed by an optional semicolon.
+_ENTITY_RE: re.Pattern[str] = re.compile(r"&(?:#[xX]([0-9a-fA-F]*)|#([0-9]*)|([a-zA-Z0-9]*))(;?)")
+
+
+def _decode_entity_match(match: re.Match[str], in_attribute: bool) -> str:
+    hex_digits, dec_digits, entity_name, semicolon = match.groups()
+
+    # Named entity (the common case, so it is checked first). Exact "&name;"
+    # references were already resolved by the caller's _NAMED_REFERENCES lookup.
+    if entity_name:
+        # Try without semicolon for legacy compatibility
+        # Only legacy entities can be used without semicolons
+        value = _LEGACY_NAMED.get(entity_name)
+        if value is not None:
+            # Legacy entities without semicolon have strict rules in attributes:
+            # don't decode if followed by ASCII alphanumeric or '='
+            # Per HTML5 spec §13.2.5.72
+            # The name group is greedy over [a-zA-Z0-9], so only '=' can follow.
+            if in_attribute and not semicolon:
+                end = match.end()
+                if match.string[end : end + 1] == "=":
+                    return match.group(0)
+            return value + semicolon
+
+        # Try longest prefix match for legacy entities
+        # This handles cases like &notit where &not is valid but &notit is not
+        node: Any = _LEGACY_TRIE
+        prefix_value = ""
+        prefix_len = 0
+        for k, ch in enumerate(entity_name, 1):
+            node = node.get(ch)
+            if node is None:
+                break
+            if "" in node:
+                prefix_value = node[""]
+                prefix_len = k
+
+        if prefix_len:
+            if in_attribute:
+                # In attributes with prefix match, the next char is always alphanumeric
+                # Per HTML5 spec, don't decode if followed by alphanumeric or =
+                return match.group(0)
+            return prefix_value + entity_name[prefix_len:] + semicolon
+
+        # No match found
+        return match.group(0)
+
+    # Numeric entity
+    if hex_digits:
+        return decode_numeric_entity(int(hex_digits, 16))
+    if dec_digits:
+        return decode_numeric_entity(int(dec_digits))
+
+    # Bare '&' or numeric entity without digits, keep as-is
+    return match.group(0)
+
+
 def decode_entities_in_text(text: str, in_attribute: bool = False) -> str:
     """Decode all HTML entities in text.
 
@@ -209,136 +282,22 @@ def decode_entities_in_text(text: str, in_attribute: bool = False) -> str:
     Returns:
         Text with entities decoded
     """
-    result: list[str] = []
-    i = 0
-    length = len(text)
-    while i < length:
-        next_amp = text.find("&", i)
-        if next_amp == -1:
-            result.append(text[i:])
-            break
-
-        if next_amp > i:
-            result.append(text[i:next_amp])
-
-        i = next_amp
-        # Look for entity
-        j = i + 1
-
-        # Check for numeric entity
-        if j < length and text[j] == "#":
-            j += 1
-            is_hex = False
-
-            if j < length and text[j] in "xX":
-                is_hex = True
-                j += 1
-
-            # Collect digits
-            digit_start = j
-            if is_hex:
-                while j < length and text[j] in "0123456789abcdefABCDEF":
-                    j += 1
-            else:
-                while j < length and text[j].isdigit():
-                    j += 1
-
-            has_semicolon = j < length and text[j] == ";"
-            digit_text = text[digit_start:j]
-
-            if digit_text:
-                result.append(decode_numeric_entity(digit_text, is_hex=is_hex))
-                i = j + 1 if has_semicolon else j
-                continue
-
-            # Invalid numeric entity, keep as-is
-            result.append(text[i : j + 1 if has_semicolon else j])
-            i = j + 1 if has_semicolon else j
-            continue
-
-        # Named entity
-        # Collect alphanumeric characters (entity names are case-sensitive and can include uppercase)
-        while j < length and (text[j].isalpha() or text[j].isdigit()):
-            j += 1
-
-        entity_name = text[i + 1 : j]
-        has_semicolon = j < length and text[j] == ";"
-
-        if not entity_name:
-            result.append("&")
-            i += 1
-            continue
-
-        # Try exact match first (with semicolon expected)
-        if has_semicolon and entity_name in NAMED_ENTITIES:
-            result.append(NAMED_ENTITIES[entity_name])
-            i = j + 1
-            continue
-        # If semicolon present but no exact match, allow legacy prefix match in text
-        if has_semicolon and not in_attribute:
-            best_match: str | None = None
-            best_match_len = 0
-            for k in range(len(entity_name), 0, -1):
-                prefix = entity_name[:k]
-                if prefix in LEGACY_ENTITIES and prefix in NAMED_ENTITIES:
-                    best_match = NAMED_ENTITIES[prefix]
-                    best_match_len = k
-                    break
-            if best_match:
-                result.append(best_match)
-                i = i + 1 + best_match_len
-                continue
+    if "&" not in text:
+        return text
+    if in_attribute:
+        return _ENTITY_RE.sub(_decode_attribute_entity, text)
+    return _ENTITY_RE.sub(_decode_text_entity, text)
 
-        # Try without semicolon for legacy compatibility
-        # Only legacy entities can be used without semicolons
-        if entity_name in LEGACY_ENTITIES and entity_name in NAMED_ENTITIES:
-            # Legacy entities without semicolon have strict rules in attributes:
-            # don't decode if followed by alphanumeric or '='
-            # Per HTML5 spec §13.2.5.72
-            next_char = text[j] if j < length else None
-            if in_attribute and next_char and (next_char.isalnum() or next_char == "="):
-                result.append("&")
-                i += 1
-                continue
-
-            # Decode legacy entity
-            result.append(NAMED_ENTITIES[entity_name])
-            i = j
-            continue
-
-        # Try longest prefix match for legacy entities without semicolon
-        # This handles cases like &notit where &not is valid but &notit is not
-        best_match = None
-        best_match_len = 0
-        for k in range(len(entity_name), 0, -1):
-            prefix = entity_name[:k]
-            if prefix in LEGACY_ENTITIES and prefix in NAMED_ENTITIES:
-                best_match = NAMED_ENTITIES[prefix]
-                best_match_len = k
-                break
 
-        if best_match:
-            # Check legacy entity rules
-            end_pos = i + 1 + best_match_len
-            next_char = text[end_pos] if end_pos < length else None
-            if in_attribute:
-                # In attributes with prefix match, the next char is always alphanumeric
-                # (since entity_name was built from alphanumerics only)
-                # Per HTML5 spec, don't decode if followed by alphanumeric or =
-                result.append("&")
-                i += 1
-                continue
+def _decode_text_entity(match: re.Match[str]) -> str:
+    value = _NAMED_REFERENCES.get(match.group(0))
+    if value is not None:
+        return value
+    return _decode_entity_match(match, in_attribute=False)
 
-            result.append(best_match)
-            i = i + 1 + best_match_len
-            continue
 
-        # No match found
-        if has_semicolon:
-            result.append(text[i : j + 1])
-            i = j + 1
-        else:
-            result.append("&")
-            i += 1
-
-    return "".join(result)
+def _decode_attribute_entity(match: re.Match[str]) -> str:
+    value = _NAMED_REFERENCES.get(match.group(0))
+    if value is not None:
+        return value
+    return _decode_entity_match(match, in_attribute=True)
@@ -1,40 +1,40 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, Any
+import re
+from typing import TYPE_CHECKING, Any, ClassVar
 
 from .selector import query
 from .serialize import to_html
 
 if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+
     from .tokens import Doctype
 
 
+# Pragmatic: escape the few characters that commonly change Markdown meaning.
+# Keep this minimal to preserve readability.
+_MARKDOWN_ESCAPE_TABLE = str.maketrans({ch: "\\" + ch for ch in "\\`*_[]"})
+
+_BACKTICK_RUN_RE = re.compile(r"`+")
+
+_MARKDOWN_WHITESPACE: frozenset[str] = frozenset(" \t\n\r\f")
+_MARKDOWN_WHITESPACE_RE = re.compile(r"[ \t\n\r\f]+")
+
+
 def _markdown_escape_text(s: str) -> str:
     if not s:
         return ""
-    # Pragmatic: escape the few characters that commonly change Markdown meaning.
-    # Keep this minimal to preserve readability.
-    out: list[str] = []
-    for ch in s:
-        if ch in "\\`*_[]":
-            out.append("\\")
-        out.append(ch)
-    return "".join(out)
+    return s.translate(_MARKDOWN_ESCAPE_TABLE)
 
 
 def _markdown_code_span(s: str | None) -> str:
     if s is None:
         s = ""
+    if "`" not in s:
+        return f"`{s}`"
     # Use a backtick fence longer than any run of backticks inside.
-    longest = 0
-    run = 0
-    for ch in s:
-        if ch == "`":
-            run += 1
-            if run > longest:
-                longest = run
-        else:
-            run = 0
+    longest = max((len(m) for m in _BACKTICK_RUN_RE.findall(s)), default=0)
     fence = "`" * (longest + 1)
     # CommonMark requires a space if the content starts/ends with backticks.
     needs_space = s.startswith("`") or s.endswith("`")
@@ -55,26 +55,24 @@ class _MarkdownBuilder:
         self._newline_count = 0
         self._pending_space = False
 
-    def _rstrip_last_segment(self) -> None:
-        if not self._buf:
-            return
-        last = self._buf[-1]
-        stripped = last.rstrip(" \t")
-        if stripped != last:
-            self._buf[-1] = stripped
-
     def newline(self, count: int = 1) -> None:
+        buf = self._buf
         for _ in range(count):
             self._pending_space = False
-            self._rstrip_last_segment()
-            self._buf.append("\n")
+            if buf:
+                last = buf[-1]
+                stripped = last.rstrip(" \t")
+                if stripped != last:
+                    buf[-1] = stripped
+            buf.append("\n")
             # Track newlines to make it easy to insert blank lines.
             if self._newline_count < 2:
                 self._newline_count += 1
 
     def ensure_newlines(self, count: int) -> None:
-        while self._newline_count < count:
-            self.newline(1)
+        # The newline count is capped at 2, and so is every requested count.
+        if self._newline_count < count:
+            self.newline(count - self._newline_count)
 
     def raw(self, s: str) -> None:
         if not s:
@@ -83,19 +81,14 @@ class _MarkdownBuilder:
         # If we've collapsed whitespace and the next output is raw (e.g. "**"),
         # we still need to emit a single separating space.
         if self._pending_space:
-            first = s[0]
-            if first not in " \t\n\r\f" and self._buf and self._newline_count == 0:
+            if s[0] not in _MARKDOWN_WHITESPACE and self._buf and self._newline_count == 0:
                 self._buf.append(" ")
             self._pending_space = False
 
         self._buf.append(s)
         if "\n" in s:
             # Count trailing newlines (cap at 2 for blank-line semantics).
-            trailing = 0
-            i = len(s) - 1
-            while i >= 0 and s[i] == "\n":
-                trailing += 1
-                i -= 1
+            trailing = len(s) - len(s.rstrip("\n"))
             self._newline_count = min(2, trailing)
             if trailing:
                 self._pending_space = False
@@ -110,22 +103,39 @@ class _MarkdownBuilder:
             self.raw(s)
             return
 
-        for ch in s:
-            if ch in " \t\n\r\f":
+        # Whitespace runs split the text into words; each run collapses to a
+        # pending space that is only emitted before the next word.
+        buf = self._buf
+        for i, word in enumerate(_MARKDOWN_WHITESPACE_RE.split(s)):
+            if i:
                 self._pending_space = True
+            if not word:
                 continue
 
             if self._pending_space:
-                if self._buf and self._newline_count == 0:
-                    self._buf.append(" ")
+                if buf and self._newline_count == 0:
+                    buf.append(" ")
                 self._pending_space = False
 
-            self._buf.append(ch)
+            buf.append(word)
             self._newline_count = 0
 
     def finish(self) -> str:
-        out = "".join(self._buf)
-        return out.strip(" \t\n")
+        # Trim whitespace-only segments at both ends before joining, so the
+        # joined output doesn't need a second stripping copy.
+        buf = self._buf
+        while buf and not buf[-1].strip(" \t\n"):
+            buf.pop()
+        if not buf:
+            return ""
+        buf[-1] = buf[-1].rstrip(" \t\n")
+        start = 0
+        while not buf[start].strip(" \t\n"):
+            start += 1
+        if start:
+            del buf[:start]
+        buf[0] = buf[0].lstrip(" \t\n")
+        return "".join(buf)
 
 
 # Type alias for any node type
@@ -133,30 +143,38 @@ NodeType = "SimpleDomNode | ElementNode | TemplateNode | TextNode"
 
 
 def _to_text_collect(node: Any, parts: list[str], strip: bool) -> None:
-    name: str = node.name
-
-    if name == "#text":
-        data: str | None = node.data
-        if not data:
-            return
-        if strip:
-            data = data.strip()
+    # Walk with an explicit stack so deeply nested documents don't hit the recursion limit.
+    stack: list[Any] = [node]
+    while stack:
+        node = stack.pop()
+        name: str = node.name
+
+        if name == "#text":
+            data: str | None = node.data
             if not data:
-                return
-        parts.append(data)
-        return
+                continue
+            if strip:
+                data = data.strip()
+                if not data:
+                    continue
+            parts.append(data)
+            continue
 
-    if node.children:
-        for child in node.children:
-            _to_text_collect(child, parts, strip=strip)
+        # Pushed first so it is visited after the children.
+        if node.template_content:
+            stack.append(node.template_content)
 
-    if isinstance(node, ElementNode) and node.template_content:
-        _to_text_collect(node.template_content, parts, strip=strip)
+        if node.children:
+            stack.extend(reversed(node.children))
 
 
 class SimpleDomNode:
     __slots__ = ("attrs", "children", "data", "name", "namespace", "parent")
 
+    # Only ElementNode has a template_content slot; this default lets tree walks
+    # read the attribute on any node instead of checking the type first.
+    template_content: SimpleDomNode | None = None
+
     name: str
     parent: SimpleDomNode | ElementNode | TemplateNode | None
     attrs: dict[str, str | None] | None
@@ -188,6 +206,30 @@ class SimpleDomNode:
             self.children = []
             self.attrs = attrs if attrs is not None else {}
 
+    @classmethod
+    def new_comment(cls, data: str) -> SimpleDomNode:
+        """Create a comment node without going through the generic constructor."""
+        node = cls.__new__(cls)
+        node.name = "#comment"
+        node.parent = None
+        node.data = data
+        node.namespace = None
+        node.children = None
+        node.attrs = None
+        return node
+
+    @classmethod
+    def new_doctype(cls, doctype: Doctype) -> SimpleDomNode:
+        """Create a doctype node without going through the generic constructor."""
+        node = cls.__new__(cls)
+        node.name = "!doctype"
+        node.parent = None
+        node.data = doctype
+        node.namespace = None
+        node.children = None
+        node.attrs = None
+        return node
+
     def append_child(self, node: Any) -> None:
         if self.children is not None:
             self.children.append(node)
@@ -240,6 +282,14 @@ class SimpleDomNode:
 
         Template element contents are included via `template_content`.
         """
+        # Fast path for the common element wrapping a single text node.
+        children = self.children
+        if children and len(children) == 1 and children[0].name == "#text" and not self.template_content:
+            data: str | None = children[0].data
+            if not data:
+                return ""
+            return data.strip() if strip else data
+
         parts: list[str] = []
         _to_text_collect(self, parts, strip=strip)
         if not parts:
@@ -369,11 +419,14 @@ class TemplateNode(ElementNode):
         data: str | None = None,
         namespace: str | None = None,
     ) -> None:
-        super().__init__(name, attrs, namespace)
-        if self.namespace == "html":
-            self.template_content = SimpleDomNode("#document-fragment")
-        else:
-            self.template_content = None
+        # Same fields as ElementNode.__init__, but template_content is set once.
+        self.name = name
+        self.parent = None
+        self.data = None
+        self.namespace = namespace
+        self.children = []
+        self.attrs = attrs if attrs is not None else {}
+        self.template_content = SimpleDomNode("#document-fragment") if namespace == "html" else None
 
     def clone_node(self, deep: bool = False) -> TemplateNode:
         clone = TemplateNode(
@@ -391,18 +444,18 @@ class TemplateNode(ElementNode):
 
 
 class TextNode:
-    __slots__ = ("data", "name", "namespace", "parent")
+    __slots__ = ("data", "parent")
+
+    # Constant for every text node, so kept on the class rather than per instance.
+    name: ClassVar[str] = "#text"
+    namespace: ClassVar[None] = None
 
     data: str | None
-    name: str
-    namespace: None
     parent: SimpleDomNode | ElementNode | TemplateNode | None
 
     def __init__(self, data: str | None) -> None:
         self.data = data
         self.parent = None
-        self.name = "#text"
-        self.namespace = None
 
     @property
     def text(self) -> str:
@@ -423,9 +476,10 @@ class TextNode:
         return builder.finish()
 
     @property
-    def children(self) -> list[Any]:
-        """Return empty list for TextNode (leaf node)."""
-        return []
+    def children(self) -> Sequence[Any]:
+        """Return an empty tuple for TextNode (leaf node)."""
+        # Immutable, so the same empty sequence can be returned every time.
+        return ()
 
     def has_child_nodes(self) -> bool:
         """Return False for TextNode."""
@@ -463,170 +517,263 @@ _MARKDOWN_BLOCK_ELEMENTS: frozenset[str] = frozenset(
 )
 
 
+# The Markdown walk keeps its own stack of work items. Each item is either a node
+# to render, as (node, builder, preserve_whitespace, list_depth), or a deferred
+# call to run once the node's children have been rendered, as (None, func, args).
+_MarkdownStack = list[tuple[Any, ...]]
+
+
 def _to_markdown_walk(node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int) -> None:
-    name: str = node.name
+    stack: _MarkdownStack = [(node, builder, preserve_whitespace, list_depth)]
+    pop = stack.pop
+    get_handler = _MARKDOWN_HANDLERS.get
+    while stack:
+        item = pop()
+        node = item[0]
+        if node is None:
+            item[1](*item[2])
+            continue
+
+        _, builder, preserve_whitespace, list_depth = item
+        name: str = node.name
+
+        if name == "#text":
+            data = node.data
+            if not data:
+                continue
+            if preserve_whitespace:
+                builder.raw(data)
+            else:
+                builder.text(data.translate(_MARKDOWN_ESCAPE_TABLE))
+            continue
 
-    if name == "#text":
-        if preserve_whitespace:
-            builder.raw(node.data or "")
-        else:
-            builder.text(_markdown_escape_text(node.data or ""), preserve_whitespace=False)
-        return
+        if name == "br":
+            builder.newline(1)
+            continue
 
-    if name == "br":
-        builder.newline(1)
-        return
+        # Comments/doctype don't contribute.
+        if name == "#comment" or name == "!doctype":
+            continue
 
-    # Comments/doctype don't contribute.
-    if name == "#comment" or name == "!doctype":
-        return
+        # Document containers contribute via descendants.
+        if name.startswith("#"):
+            if node.children:
+                _push_markdown_children(stack, node.children, builder, preserve_whitespace, list_depth)
+            continue
 
-    # Document containers contribute via descendants.
-    if name.startswith("#"):
-        if node.children:
-            for child in node.children:
-                _to_markdown_walk(child, builder, preserve_whitespace, list_depth)
-        return
+        # Parsed names are almost always lowercase already; skip the copy then.
+        tag = name if name.islower() else name.lower()
 
-    tag = name.lower()
+        handler = get_handler(tag)
+        if handler is not None:
+            handler(node, builder, preserve_whitespace, list_depth, stack)
+            continue
 
-    # Preserve <img> and <table> as HTML.
-    if tag == "img":
-        builder.raw(node.to_html(indent=0, indent_size=2, pretty=False))
-        return
+        _markdown_container(node, builder, preserve_whitespace, list_depth, stack, tag)
 
-    if tag == "table":
-        builder.ensure_newlines(2 if builder._buf else 0)
-        builder.raw(node.to_html(indent=0, indent_size=2, pretty=False))
-        builder.ensure_newlines(2)
-        return
 
-    # Headings.
-    if tag in {"h1", "h2", "h3", "h4", "h5", "h6"}:
-        builder.ensure_newlines(2 if builder._buf else 0)
-        level = int(tag[1])
-        builder.raw("#" * level)
-        builder.raw(" ")
-        if node.children:
-            for child in node.children:
-                _to_markdown_walk(child, builder, preserve_whitespace=False, list_depth=list_depth)
-        builder.ensure_newlines(2)
-        return
+def _push_markdown_children(
+    stack: _MarkdownStack, children: list[Any], builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int
+) -> None:
+    # Reversed, so the first child is popped (rendered) first.
+    for child in reversed(children):
+        stack.append((child, builder, preserve_whitespace, list_depth))
 
-    # Horizontal rule.
-    if tag == "hr":
-        builder.ensure_newlines(2 if builder._buf else 0)
-        builder.raw("---")
-        builder.ensure_newlines(2)
-        return
 
+def _markdown_container(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack, tag: str
+) -> None:
+    # Add spacing after block containers to keep output readable.
+    if tag in _MARKDOWN_BLOCK_ELEMENTS:
+        stack.append((None, builder.ensure_newlines, (2,)))
+
+    # Containers / unknown tags: recurse into children.
+    next_preserve = preserve_whitespace or (tag in {"textarea", "script", "style"})
+    if node.template_content:
+        stack.append((node.template_content, builder, next_preserve, list_depth))
+
+    if node.children:
+        _push_markdown_children(stack, node.children, builder, next_preserve, list_depth)
+
+
+def _markdown_raw_html(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    # Preserve <img> as HTML.
+    builder.raw(node.to_html(indent=0, indent_size=2, pretty=False))
+
+
+def _markdown_table(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    # Preserve <table> as HTML.
+    builder.ensure_newlines(2 if builder._buf else 0)
+    builder.raw(node.to_html(indent=0, indent_size=2, pretty=False))
+    builder.ensure_newlines(2)
+
+
+def _markdown_heading(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    builder.ensure_newlines(2 if builder._buf else 0)
+    level = int(node.name[1])
+    builder.raw("#" * level)
+    builder.raw(" ")
+    stack.append((None, builder.ensure_newlines, (2,)))
+    if node.children:
+        _push_markdown_children(stack, node.children, builder, False, list_depth)
+
+
+def _markdown_hr(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    builder.ensure_newlines(2 if builder._buf else 0)
+    builder.raw("---")
+    builder.ensure_newlines(2)
+
+
+def _markdown_pre(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
     # Code blocks.
-    if tag == "pre":
-        builder.ensure_newlines(2 if builder._buf else 0)
-        code = node.to_text(separator="", strip=False)
-        builder.raw("```")
+    builder.ensure_newlines(2 if builder._buf else 0)
+    code = node.to_text(separator="", strip=False)
+    builder.raw("```")
+    builder.newline(1)
+    if code:
+        builder.raw(code.rstrip("\n"))
         builder.newline(1)
-        if code:
-            builder.raw(code.rstrip("\n"))
-            builder.newline(1)
-        builder.raw("```")
-        builder.ensure_newlines(2)
-        return
+    builder.raw("```")
+    builder.ensure_newlines(2)
 
-    # Inline code.
-    if tag == "code" and not preserve_whitespace:
-        code = node.to_text(separator="", strip=False)
-        builder.raw(_markdown_code_span(code))
-        return
 
-    # Paragraph-like blocks.
-    if tag == "p":
-        builder.ensure_newlines(2 if builder._buf else 0)
-        if node.children:
-            for child in node.children:
-                _to_markdown_walk(child, builder, preserve_whitespace=False, list_depth=list_depth)
-        builder.ensure_newlines(2)
+def _markdown_code(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    # Inline code; inside preformatted content it is just a container.
+    if preserve_whitespace:
+        _markdown_container(node, builder, preserve_whitespace, list_depth, stack, "code")
         return
+    code = node.to_text(separator="", strip=False)
+    builder.raw(_markdown_code_span(code))
 
-    # Blockquotes.
-    if tag == "blockquote":
-        builder.ensure_newlines(2 if builder._buf else 0)
-        inner = _MarkdownBuilder()
-        if node.children:
-            for child in node.children:
-                _to_markdown_walk(child, inner, preserve_whitespace=False, list_depth=list_depth)
-        text = inner.finish()
-        if text:
-            lines = text.split("\n")
-            for i, line in enumerate(lines):
-                if i:
-                    builder.newline(1)
-                builder.raw("> ")
-                builder.raw(line)
-        builder.ensure_newlines(2)
-        return
 
-    # Lists.
-    if tag in {"ul", "ol"}:
-        builder.ensure_newlines(2 if builder._buf else 0)
-        ordered = tag == "ol"
-        idx = 1
-        for child in node.children or []:
-            if child.name.lower() != "li":
-                continue
-            if idx > 1:
+def _markdown_paragraph(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    builder.ensure_newlines(2 if builder._buf else 0)
+    stack.append((None, builder.ensure_newlines, (2,)))
+    if node.children:
+        _push_markdown_children(stack, node.children, builder, False, list_depth)
+
+
+def _markdown_blockquote(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    # Children render into their own builder, which is then quoted line by line.
+    builder.ensure_newlines(2 if builder._buf else 0)
+    inner = _MarkdownBuilder()
+    stack.append((None, _markdown_quote, (builder, inner)))
+    if node.children:
+        _push_markdown_children(stack, node.children, inner, False, list_depth)
+
+
+def _markdown_quote(builder: _MarkdownBuilder, inner: _MarkdownBuilder) -> None:
+    text = inner.finish()
+    if text:
+        lines = text.split("\n")
+        for i, line in enumerate(lines):
+            if i:
                 builder.newline(1)
-            indent = "  " * list_depth
-            marker = f"{idx}. " if ordered else "- "
-            builder.raw(indent)
-            builder.raw(marker)
-            # Render list item content inline-ish.
-            for li_child in child.children or []:
-                _to_markdown_walk(li_child, builder, preserve_whitespace=False, list_depth=list_depth + 1)
-            idx += 1
-        builder.ensure_newlines(2)
-        return
+            builder.raw("> ")
+            builder.raw(line)
+    builder.ensure_newlines(2)
+
+
+def _markdown_list(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    builder.ensure_newlines(2 if builder._buf else 0)
+    stack.append((None, builder.ensure_newlines, (2,)))
+    ordered = node.name.lower() == "ol"
+    items = [child for child in node.children or [] if child.name.lower() == "li"]
+    # Pushed last item first, so the list renders in document order.
+    for idx in range(len(items), 0, -1):
+        item = items[idx - 1]
+        # Render list item content inline-ish.
+        if item.children:
+            _push_markdown_children(stack, item.children, builder, False, list_depth + 1)
+        marker = f"{idx}. " if ordered else "- "
+        stack.append((None, _markdown_list_marker, (builder, idx, "  " * list_depth, marker)))
+
+
+def _markdown_list_marker(builder: _MarkdownBuilder, idx: int, indent: str, marker: str) -> None:
+    if idx > 1:
+        builder.newline(1)
+    builder.raw(indent)
+    builder.raw(marker)
 
-    # Emphasis/strong.
-    if tag in {"em", "i"}:
-        builder.raw("*")
-        for child in node.children or []:
-            _to_markdown_walk(child, builder, preserve_whitespace=False, list_depth=list_depth)
-        builder.raw("*")
-        return
 
-    if tag in {"strong", "b"}:
-        builder.raw("**")
-        for child in node.children or []:
-            _to_markdown_walk(child, builder, preserve_whitespace=False, list_depth=list_depth)
-        builder.raw("**")
-        return
+def _markdown_emphasis(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    builder.raw("*")
+    stack.append((None, builder.raw, ("*",)))
+    if node.children:
+        _push_markdown_children(stack, node.children, builder, False, list_depth)
 
-    # Links.
-    if tag == "a":
-        href = ""
-        if node.attrs and "href" in node.attrs and node.attrs["href"] is not None:
-            href = str(node.attrs["href"])
-
-        builder.raw("[")
-        for child in node.children or []:
-            _to_markdown_walk(child, builder, preserve_whitespace=False, list_depth=list_depth)
-        builder.raw("]")
-        if href:
-            builder.raw("(")
-            builder.raw(href)
-            builder.raw(")")
-        return
 
-    # Containers / unknown tags: recurse into children.
-    next_preserve = preserve_whitespace or (tag in {"textarea", "script", "style"})
+def _markdown_strong(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    builder.raw("**")
+    stack.append((None, builder.raw, ("**",)))
     if node.children:
-        for child in node.children:
-            _to_markdown_walk(child, builder, next_preserve, list_depth)
+        _push_markdown_children(stack, node.children, builder, False, list_depth)
 
-    if isinstance(node, ElementNode) and node.template_content:
-        _to_markdown_walk(node.template_content, builder, next_preserve, list_depth)
 
-    # Add spacing after block containers to keep output readable.
-    if tag in _MARKDOWN_BLOCK_ELEMENTS:
-        builder.ensure_newlines(2)
+def _markdown_link(
+    node: Any, builder: _MarkdownBuilder, preserve_whitespace: bool, list_depth: int, stack: _MarkdownStack
+) -> None:
+    href = ""
+    if node.attrs and "href" in node.attrs and node.attrs["href"] is not None:
+        href = str(node.attrs["href"])
+
+    builder.raw("[")
+    stack.append((None, _markdown_close_link, (builder, href)))
+    if node.children:
+        _push_markdown_children(stack, node.children, builder, False, list_depth)
+
+
+def _markdown_close_link(builder: _MarkdownBuilder, href: str) -> None:
+    builder.raw("]")
+    if href:
+        builder.raw("(")
+        builder.raw(href)
+        builder.raw(")")
+
+
+# Elements with dedicated Markdown output, keyed by lowercased tag name.
+# Anything else is rendered as a container of its children.
+_MARKDOWN_HANDLERS: dict[str, Callable[[Any, _MarkdownBuilder, bool, int, _MarkdownStack], None]] = {
+    "img": _markdown_raw_html,
+    "table": _markdown_table,
+    "h1": _markdown_heading,
+    "h2": _markdown_heading,
+    "h3": _markdown_heading,
+    "h4": _markdown_heading,
+    "h5": _markdown_heading,
+    "h6": _markdown_heading,
+    "hr": _markdown_hr,
+    "pre": _markdown_pre,
+    "code": _markdown_code,
+    "p": _markdown_paragraph,
+    "blockquote": _markdown_blockquote,
+    "ul": _markdown_list,
+    "ol": _markdown_list,
+    "em": _markdown_emphasis,
+    "i": _markdown_emphasis,
+    "strong": _markdown_strong,
+    "b": _markdown_strong,
+    "a": _markdown_link,
+}
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 from typing import TYPE_CHECKING, Any
 
-from .encoding import decode_html
+from .encoding import decode_html, sniff_html_encoding
+from .errors import StrictModeError
 from .tokenizer import Tokenizer, TokenizerOpts
 from .treebuilder import TreeBuilder
 
@@ -14,27 +15,15 @@ if TYPE_CHECKING:
     from .tokens import ParseError
 
 
-class StrictModeError(SyntaxError):
-    """Raised when strict mode encounters a parse error.
-
-    Inherits from SyntaxError to provide Python 3.11+ enhanced error display
-    with source location highlighting.
-    """
-
-    error: ParseError
-
-    def __init__(self, error: ParseError) -> None:
-        self.error = error
-        # Use the ParseError's as_exception() to get enhanced display
-        exc = error.as_exception()
-        super().__init__(exc.msg)
-        # Copy SyntaxError attributes for enhanced display
-        self.filename = exc.filename
-        self.lineno = exc.lineno
-        self.offset = exc.offset
-        self.text = exc.text
-        self.end_lineno = getattr(exc, "end_lineno", None)
-        self.end_offset = getattr(exc, "end_offset", None)
+# Initial tokenizer state (and RAWTEXT end tag) for HTML fragment contexts
+# whose content isn't tokenized as data.
+_FRAGMENT_INITIAL_STATE: dict[str, tuple[int, str | None]] = {
+    "textarea": (Tokenizer.RAWTEXT, "textarea"),
+    "title": (Tokenizer.RAWTEXT, "title"),
+    "style": (Tokenizer.RAWTEXT, "style"),
+    "plaintext": (Tokenizer.PLAINTEXT, None),
+    "script": (Tokenizer.PLAINTEXT, None),
+}
 
 
 class JustHTML:
@@ -67,7 +56,7 @@ class JustHTML:
 
         html_str: str
         if isinstance(html, (bytes, bytearray, memoryview)):
-            html_str, chosen = decode_html(bytes(html), transport_encoding=encoding)
+            html_str, chosen = decode_html(html, transport_encoding=encoding)
             self.encoding = chosen
         elif html is not None:
             html_str = str(html)
@@ -82,32 +71,51 @@ class JustHTML:
             iframe_srcdoc=iframe_srcdoc,
             collect_errors=should_collect,
         )
-        opts = tokenizer_opts or TokenizerOpts()
-
         # For RAWTEXT fragment contexts, set initial tokenizer state and rawtext tag
+        initial = None
         if fragment_context and not fragment_context.namespace:
-            rawtext_elements = {"textarea", "title", "style"}
-            tag_name = fragment_context.tag_name.lower()
-            if tag_name in rawtext_elements:
-                opts.initial_state = Tokenizer.RAWTEXT
-                opts.initial_rawtext_tag = tag_name
-            elif tag_name in ("plaintext", "script"):
-                opts.initial_state = Tokenizer.PLAINTEXT
-
-        self.tokenizer = Tokenizer(self.tree_builder, opts, collect_errors=should_collect)
+            initial = _FRAGMENT_INITIAL_STATE.get(fragment_context.tag_name_lower)
+
+        # Each parse gets its own options, since they stay reachable (and
+        # mutable) through doc.tokenizer.opts
+        opts: TokenizerOpts
+        if initial is None:
+            opts = tokenizer_opts or TokenizerOpts()
+        elif tokenizer_opts is None:
+            opts = TokenizerOpts(initial_state=initial[0], initial_rawtext_tag=initial[1])
+        else:
+            # Copy rather than mutate the caller's options
+            initial_state, rawtext_tag = initial
+            opts = tokenizer_opts.copy(
+                initial_state=initial_state,
+                initial_rawtext_tag=rawtext_tag if rawtext_tag is not None else tokenizer_opts.initial_rawtext_tag,
+            )
+
+        # In strict mode the tokenizer raises on its first error, skipping the rest of the parse
+        self.tokenizer = Tokenizer(self.tree_builder, opts, collect_errors=should_collect, strict=strict)
         # Link tokenizer to tree_builder for position info
         self.tree_builder.tokenizer = self.tokenizer
 
         self.tokenizer.run(html_str)
         self.root = self.tree_builder.finish()
 
-        # Merge errors from both tokenizer and tree builder
+        # Merge errors from both tokenizer and tree builder into a new list, so
+        # changing doc.errors never touches the parser's own lists
         self.errors = self.tokenizer.errors + self.tree_builder.errors
 
-        # In strict mode, raise on first error
+        # In strict mode, raise on the first tree builder error
         if strict and self.errors:
             raise StrictModeError(self.errors[0])
 
+    @staticmethod
+    def sniff_encoding(html: bytes | bytearray | memoryview) -> str:
+        """Return the encoding that parsing these bytes would pick.
+
+        Pass the result as `encoding=` when parsing many documents known to
+        share an encoding, so each parse skips the BOM and meta prescan.
+        """
+        return sniff_html_encoding(html)[0]
+
     def query(self, selector: str) -> list[Any]:
         """Query the document using a CSS selector. Delegates to root.query()."""
         return self.root.query(selector)
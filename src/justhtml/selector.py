@@ -3,7 +3,17 @@
 
 from __future__ import annotations
 
-from typing import Any
+import re
+from functools import lru_cache
+from string import ascii_letters
+from sys import intern
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    # A compiled simple selector: (element node, matcher) -> whether it matches
+    MatchFunction = Callable[[Any, "SelectorMatcher"], bool]
 
 
 class SelectorError(ValueError):
@@ -28,20 +38,37 @@ class TokenType:
     EOF: str = "EOF"
 
 
-class Token:
-    __slots__ = ("type", "value")
-
+class Token(NamedTuple):
     type: str
-    value: str | None
-
-    def __init__(self, token_type: str, value: str | None = None) -> None:
-        self.type = token_type
-        self.value = value
+    value: str | None = None
 
     def __repr__(self) -> str:
         return f"Token({self.type}, {self.value!r})"
 
 
+# Tokens are immutable, so the ones without a variable value are shared
+_UNIVERSAL_TOKEN = Token(TokenType.UNIVERSAL)
+_ATTR_START_TOKEN = Token(TokenType.ATTR_START)
+_ATTR_END_TOKEN = Token(TokenType.ATTR_END)
+_COMMA_TOKEN = Token(TokenType.COMMA)
+_COLON_TOKEN = Token(TokenType.COLON)
+_PAREN_OPEN_TOKEN = Token(TokenType.PAREN_OPEN)
+_PAREN_CLOSE_TOKEN = Token(TokenType.PAREN_CLOSE)
+_EOF_TOKEN = Token(TokenType.EOF)
+_COMBINATOR_TOKENS: dict[str, Token] = {ch: Token(TokenType.COMBINATOR, ch) for ch in " >+~"}
+_ATTR_OP_TOKENS: dict[str, Token] = {op: Token(TokenType.ATTR_OP, op) for op in ("=", "~=", "|=", "^=", "$=", "*=")}
+
+# Character classes for the tokenizer
+_WHITESPACE: frozenset[str] = frozenset(" \t\n\r\f")
+_WHITESPACE_OR_ATTR_END: frozenset[str] = _WHITESPACE | {"]"}
+_COMBINATOR_CHARS: frozenset[str] = frozenset(">+~")
+_ATTR_OP_PREFIXES: frozenset[str] = frozenset("~|^$*")
+_NAME_START_CHARS: frozenset[str] = frozenset(ascii_letters + "_-")
+
+# A run of CSS identifier characters: ASCII letters, digits, "_", "-" or any non-ASCII character
+_NAME_RUN_PATTERN: re.Pattern[str] = re.compile(r"[A-Za-z0-9_\-\x80-\U0010ffff]+")
+
+
 class SelectorTokenizer:
     """Tokenizes a CSS selector string into tokens."""
 
@@ -68,22 +95,24 @@ class SelectorTokenizer:
         return ch
 
     def _skip_whitespace(self) -> None:
-        while self.pos < self.length and self.selector[self.pos] in " \t\n\r\f":
-            self.pos += 1
+        selector = self.selector
+        pos = self.pos
+        length = self.length
+        while pos < length and selector[pos] in _WHITESPACE:
+            pos += 1
+        self.pos = pos
 
     def _is_name_start(self, ch: str) -> bool:
         # CSS identifier start: letter, underscore, or non-ASCII
-        return ch.isalpha() or ch == "_" or ch == "-" or ord(ch) > 127
-
-    def _is_name_char(self, ch: str) -> bool:
-        # CSS identifier continuation: name-start or digit
-        return self._is_name_start(ch) or ch.isdigit()
+        return ch in _NAME_START_CHARS or ord(ch) > 127
 
     def _read_name(self) -> str:
+        # CSS identifier continuation: name-start or digit
         start = self.pos
-        while self.pos < self.length and self._is_name_char(self.selector[self.pos]):
-            self.pos += 1
-        return self.selector[start : self.pos]
+        match = _NAME_RUN_PATTERN.match(self.selector, start)
+        end = match.end() if match else start
+        self.pos = end
+        return self.selector[start:end]
 
     def _read_string(self, quote: str) -> str:
         # Skip opening quote
@@ -121,7 +150,7 @@ class SelectorTokenizer:
         start = self.pos
         while self.pos < self.length:
             ch = self.selector[self.pos]
-            if ch in " \t\n\r\f]":
+            if ch in _WHITESPACE_OR_ATTR_END:
                 break
             self.pos += 1
         return self.selector[start : self.pos]
@@ -134,30 +163,30 @@ class SelectorTokenizer:
             ch = self.selector[self.pos]
 
             # Skip whitespace but remember it for combinator detection
-            if ch in " \t\n\r\f":
+            if ch in _WHITESPACE:
                 pending_whitespace = True
                 self._skip_whitespace()
                 continue
 
             # Handle combinators: >, +, ~
-            if ch in ">+~":
+            if ch in _COMBINATOR_CHARS:
                 pending_whitespace = False
                 self.pos += 1
                 self._skip_whitespace()
-                tokens.append(Token(TokenType.COMBINATOR, ch))
+                tokens.append(_COMBINATOR_TOKENS[ch])
                 continue
 
             # If we had whitespace and this isn't a combinator symbol or comma,
             # it's a descendant combinator. Note: combinators and commas consume
             # trailing whitespace, so pending_whitespace is always False after them.
-            if pending_whitespace and tokens and ch not in ",":
-                tokens.append(Token(TokenType.COMBINATOR, " "))
+            if pending_whitespace and tokens and ch != ",":
+                tokens.append(_COMBINATOR_TOKENS[" "])
             pending_whitespace = False
 
             # Universal selector
             if ch == "*":
                 self.pos += 1
-                tokens.append(Token(TokenType.UNIVERSAL))
+                tokens.append(_UNIVERSAL_TOKEN)
                 continue
 
             # ID selector
@@ -181,7 +210,7 @@ class SelectorTokenizer:
             # Attribute selector
             if ch == "[":
                 self.pos += 1
-                tokens.append(Token(TokenType.ATTR_START))
+                tokens.append(_ATTR_START_TOKEN)
                 self._skip_whitespace()
 
                 # Read attribute name
@@ -195,20 +224,20 @@ class SelectorTokenizer:
                 ch2 = self._peek()
                 if ch2 == "]":
                     self.pos += 1
-                    tokens.append(Token(TokenType.ATTR_END))
+                    tokens.append(_ATTR_END_TOKEN)
                     continue
 
                 # Read operator
                 if ch2 == "=":
                     self.pos += 1
-                    tokens.append(Token(TokenType.ATTR_OP, "="))
-                elif ch2 in "~|^$*":
+                    tokens.append(_ATTR_OP_TOKENS["="])
+                elif ch2 in _ATTR_OP_PREFIXES:
                     op_char = ch2
                     self.pos += 1
                     if self._peek() != "=":
                         raise SelectorError(f"Expected = after {op_char} at position {self.pos}")
                     self.pos += 1
-                    tokens.append(Token(TokenType.ATTR_OP, op_char + "="))
+                    tokens.append(_ATTR_OP_TOKENS[op_char + "="])
                 else:
                     raise SelectorError(f"Unexpected character in attribute selector: {ch2!r}")
 
@@ -226,20 +255,20 @@ class SelectorTokenizer:
                 if self._peek() != "]":
                     raise SelectorError(f"Expected ] at position {self.pos}")
                 self.pos += 1
-                tokens.append(Token(TokenType.ATTR_END))
+                tokens.append(_ATTR_END_TOKEN)
                 continue
 
             # Comma (selector grouping)
             if ch == ",":
                 self.pos += 1
                 self._skip_whitespace()
-                tokens.append(Token(TokenType.COMMA))
+                tokens.append(_COMMA_TOKEN)
                 continue
 
             # Pseudo-class
             if ch == ":":
                 self.pos += 1
-                tokens.append(Token(TokenType.COLON))
+                tokens.append(_COLON_TOKEN)
                 # Read pseudo-class name
                 name = self._read_name()
                 if not name:
@@ -249,7 +278,7 @@ class SelectorTokenizer:
                 # Check for functional pseudo-class
                 if self._peek() == "(":
                     self.pos += 1
-                    tokens.append(Token(TokenType.PAREN_OPEN))
+                    tokens.append(_PAREN_OPEN_TOKEN)
                     self._skip_whitespace()
 
                     # Special handling for :not() - can contain a selector
@@ -272,7 +301,7 @@ class SelectorTokenizer:
                     if self._peek() != ")":
                         raise SelectorError(f"Expected ) at position {self.pos}")
                     self.pos += 1
-                    tokens.append(Token(TokenType.PAREN_CLOSE))
+                    tokens.append(_PAREN_CLOSE_TOKEN)
                 continue
 
             # Tag name
@@ -283,7 +312,7 @@ class SelectorTokenizer:
 
             raise SelectorError(f"Unexpected character {ch!r} at position {self.pos}")
 
-        tokens.append(Token(TokenType.EOF))
+        tokens.append(_EOF_TOKEN)
         return tokens
 
 
@@ -293,7 +322,7 @@ class SelectorTokenizer:
 class SimpleSelector:
     """A single simple selector (tag, id, class, attribute, or pseudo-class)."""
 
-    __slots__ = ("arg", "name", "operator", "type", "value")
+    __slots__ = ("arg", "match", "name", "operator", "type", "value")
 
     TYPE_TAG: str = "tag"
     TYPE_ID: str = "id"
@@ -307,6 +336,7 @@ class SimpleSelector:
     operator: str | None
     value: str | None
     arg: str | None
+    match: MatchFunction
 
     def __init__(
         self,
@@ -321,6 +351,97 @@ class SimpleSelector:
         self.operator = operator
         self.value = value
         self.arg = arg  # For :not() and :nth-child()
+        self.match = self.compile()
+
+    def compile(self) -> MatchFunction:
+        """Return a function matching an element node against this selector.
+
+        This resolves the selector type (and attribute operator) once, so
+        matching a node is a single call. The function takes the node and the
+        SelectorMatcher in use, which pseudo-classes delegate to.
+        """
+        sel_type = self.type
+        name = self.name
+
+        if sel_type == self.TYPE_UNIVERSAL:
+            return _match_any
+
+        if sel_type == self.TYPE_TAG:
+            # HTML tag names are case-insensitive
+            lower_name = name.lower() if name else ""
+
+            def match_tag(node: Any, matcher: SelectorMatcher) -> bool:
+                node_name = node.name
+                # Parsed tag names are interned like the tokenizer's, so identity is the common hit
+                return bool(node_name is name or node_name.lower() == lower_name)
+
+            return match_tag
+
+        if sel_type == self.TYPE_ID:
+
+            def match_id(node: Any, matcher: SelectorMatcher) -> bool:
+                node_id = node.attrs.get("id", "") if node.attrs else ""
+                return bool(node_id == name)
+
+            return match_id
+
+        if sel_type == self.TYPE_CLASS:
+            if name is None or not _is_word(name):
+                return _match_none
+
+            def match_class(node: Any, matcher: SelectorMatcher) -> bool:
+                class_attr = node.attrs.get("class", "") if node.attrs else ""
+                return bool(class_attr) and _contains_word(class_attr, name)
+
+            return match_class
+
+        if sel_type == self.TYPE_ATTR:
+            return _compile_attribute_match((name or "").lower(), self.operator, self.value or "")
+
+        if sel_type == self.TYPE_PSEUDO:
+            pseudo_name = (name or "").lower()
+            if pseudo_name in ("nth-child", "nth-of-type"):
+                # Parse the An+B argument here rather than on every match
+                nth = _parse_nth_expression(self.arg)
+                if nth is None:
+                    return _match_none
+                a, b = nth
+
+                if pseudo_name == "nth-child":
+
+                    def match_nth_child(node: Any, matcher: SelectorMatcher) -> bool:
+                        return matcher._matches_nth_child(node, a, b)
+
+                    return match_nth_child
+
+                def match_nth_of_type(node: Any, matcher: SelectorMatcher) -> bool:
+                    return matcher._matches_nth_of_type(node, a, b)
+
+                return match_nth_of_type
+
+            if pseudo_name == "not":
+                arg = self.arg
+                if not arg:
+                    return _match_any
+                # Parse the inner selector once. If it's invalid, leave the
+                # error to be raised when matching, as it always has been.
+                try:
+                    inner: ParsedSelector | None = parse_selector(arg)
+                except SelectorError:
+                    inner = None
+
+                def match_not(node: Any, matcher: SelectorMatcher) -> bool:
+                    return not matcher.matches(node, inner if inner is not None else parse_selector(arg))
+
+                return match_not
+
+            def match_pseudo(node: Any, matcher: SelectorMatcher) -> bool:
+                return matcher._matches_pseudo(node, self)
+
+            return match_pseudo
+
+        # Unknown selector type
+        return _match_none
 
     def __repr__(self) -> str:
         parts = [f"SimpleSelector({self.type!r}"]
@@ -336,15 +457,159 @@ class SimpleSelector:
         return "".join(parts)
 
 
+def _parse_nth_expression(expr: str | None) -> tuple[int, int] | None:
+    """Parse an nth-child expression like '2n+1', 'odd', 'even', '3'."""
+    if not expr:
+        return None
+
+    expr = expr.strip().lower()
+
+    if expr == "odd":
+        return (2, 1)  # 2n+1
+    if expr == "even":
+        return (2, 0)  # 2n
+
+    # Parse An+B syntax
+    # Handle formats: n, 2n, 2n+1, -n+2, 3, etc.
+    a = 0
+    b = 0
+
+    # Remove all spaces
+    expr = expr.replace(" ", "")
+
+    if "n" in expr:
+        parts = expr.split("n")
+        a_part = parts[0]
+        b_part = parts[1] if len(parts) > 1 else ""
+
+        if a_part == "" or a_part == "+":
+            a = 1
+        elif a_part == "-":
+            a = -1
+        else:
+            try:
+                a = int(a_part)
+            except ValueError:
+                return None
+
+        if b_part:
+            try:
+                b = int(b_part)
+            except ValueError:
+                return None
+    else:
+        # Just a number
+        try:
+            b = int(expr)
+        except ValueError:
+            return None
+
+    return (a, b)
+
+
+def _match_any(node: Any, matcher: SelectorMatcher) -> bool:
+    return True
+
+
+def _match_none(node: Any, matcher: SelectorMatcher) -> bool:
+    return False
+
+
+def _is_word(word: str) -> bool:
+    # An empty word, or one containing whitespace, can never be a split() item
+    return word.split() == [word]
+
+
+def _contains_word(text: str, word: str) -> bool:
+    """Return whether word (see _is_word) is one of the whitespace-separated words in text.
+
+    Equivalent to `word in text.split()`, but scans with str.find instead of
+    building a list for every node.
+    """
+    size = len(word)
+    end = len(text)
+    i = text.find(word)
+    while i != -1:
+        j = i + size
+        if (i == 0 or text[i - 1].isspace()) and (j == end or text[j].isspace()):
+            return True
+        i = text.find(word, j)
+    return False
+
+
+def _attribute_value(node: Any, attr_name: str) -> str | None:
+    # Attribute names are case-insensitive in HTML
+    attrs = node.attrs
+    if attrs:
+        for name, value in attrs.items():
+            if name.lower() == attr_name:
+                return value  # type: ignore[no-any-return]
+    return None
+
+
+_SUBSTRING_TESTS: dict[str, Callable[[str, str], bool]] = {
+    "^=": str.startswith,
+    "$=": str.endswith,
+    "*=": str.__contains__,
+}
+
+
+def _compile_attribute_match(attr_name: str, op: str | None, value: str) -> MatchFunction:
+    if op is None:
+        return lambda node, matcher: _attribute_value(node, attr_name) is not None
+
+    if op == "=":
+        return lambda node, matcher: _attribute_value(node, attr_name) == value
+
+    if op == "~=":
+        # Space-separated word match
+        if not _is_word(value):
+            return _match_none
+
+        def match_word(node: Any, matcher: SelectorMatcher) -> bool:
+            attr_value = _attribute_value(node, attr_name)
+            return attr_value is not None and _contains_word(attr_value, value)
+
+        return match_word
+
+    if op == "|=":
+        # Hyphen-separated prefix match (e.g., lang="en" matches lang|="en-US")
+        prefix = value + "-"
+
+        def match_prefix(node: Any, matcher: SelectorMatcher) -> bool:
+            attr_value = _attribute_value(node, attr_name)
+            return attr_value is not None and (attr_value == value or attr_value.startswith(prefix))
+
+        return match_prefix
+
+    if op in _SUBSTRING_TESTS:
+        # Starts with / ends with / contains; an empty value never matches
+        if not value:
+            return _match_none
+        test = _SUBSTRING_TESTS[op]
+
+        def match_substring(node: Any, matcher: SelectorMatcher) -> bool:
+            attr_value = _attribute_value(node, attr_name)
+            return attr_value is not None and test(attr_value, value)
+
+        return match_substring
+
+    # Unknown operator
+    return _match_none
+
+
 class CompoundSelector:
     """A sequence of simple selectors (e.g., div.foo#bar)."""
 
-    __slots__ = ("selectors",)
+    __slots__ = ("matchers", "selectors")
 
     selectors: list[SimpleSelector]
+    matchers: tuple[MatchFunction, ...]
 
     def __init__(self, selectors: list[SimpleSelector] | None = None) -> None:
         self.selectors = selectors or []
+        # The compiled match functions, in order, for a tight matching loop
+        self.matchers = tuple(simple.match for simple in self.selectors)
 
     def __repr__(self) -> str:
         return f"CompoundSelector({self.selectors!r})"
@@ -383,6 +648,63 @@ class SelectorList:
 # Type alias for parsed selectors
 ParsedSelector = ComplexSelector | SelectorList
 
+# Order in which simple selectors of a compound are tested: the most selective
+# (and cheapest) checks first, so a non-matching node is rejected early.
+_SIMPLE_SELECTOR_PRIORITY: dict[str, int] = {
+    SimpleSelector.TYPE_ID: 0,
+    SimpleSelector.TYPE_TAG: 1,
+    SimpleSelector.TYPE_CLASS: 2,
+    SimpleSelector.TYPE_ATTR: 3,
+    SimpleSelector.TYPE_UNIVERSAL: 4,
+    SimpleSelector.TYPE_PSEUDO: 5,
+}
+
+# Pseudo-classes that can never raise while matching, so they may be reordered
+# (:not() can raise on a bad inner selector, unknown names raise too).
+_REORDERABLE_PSEUDO_CLASSES: frozenset[str] = frozenset(
+    {
+        "first-child",
+        "last-child",
+        "nth-child",
+        "only-child",
+        "empty",
+        "root",
+        "first-of-type",
+        "last-of-type",
+        "nth-of-type",
+        "only-of-type",
+    }
+)
+
+
+def _order_simple_selectors(selectors: list[SimpleSelector]) -> list[SimpleSelector]:
+    """Sort a compound's simple selectors by _SIMPLE_SELECTOR_PRIORITY.
+
+    Pseudo-classes that may raise stay in place and are not moved across, so
+    the same selectors are evaluated before one of them as before.
+    """
+    ordered: list[SimpleSelector] = []
+    run: list[SimpleSelector] = []
+    for simple in selectors:
+        if _is_match_barrier(simple):
+            run.sort(key=_simple_selector_priority)
+            ordered.extend(run)
+            ordered.append(simple)
+            run = []
+        else:
+            run.append(simple)
+    run.sort(key=_simple_selector_priority)
+    ordered.extend(run)
+    return ordered
+
+
+def _is_match_barrier(simple: SimpleSelector) -> bool:
+    return simple.type == SimpleSelector.TYPE_PSEUDO and (simple.name or "").lower() not in _REORDERABLE_PSEUDO_CLASSES
+
+
+def _simple_selector_priority(simple: SimpleSelector) -> int:
+    return _SIMPLE_SELECTOR_PRIORITY.get(simple.type, 5)
+
 
 class SelectorParser:
     """Parses a list of tokens into a selector AST."""
@@ -399,7 +721,7 @@ class SelectorParser:
     def _peek(self) -> Token:
         if self.pos < len(self.tokens):
             return self.tokens[self.pos]
-        return Token(TokenType.EOF)
+        return _EOF_TOKEN
 
     def _advance(self) -> Token:
         token = self._peek()
@@ -461,9 +783,11 @@ class SelectorParser:
         while True:
             token = self._peek()
 
+            # Names are interned so matching can short-circuit on identity with
+            # the (also interned) names the tokenizer gives nodes.
             if token.type == TokenType.TAG:
                 self._advance()
-                simple_selectors.append(SimpleSelector(SimpleSelector.TYPE_TAG, name=token.value))
+                simple_selectors.append(SimpleSelector(SimpleSelector.TYPE_TAG, name=intern(token.value or "")))
 
             elif token.type == TokenType.UNIVERSAL:
                 self._advance()
@@ -471,11 +795,11 @@ class SelectorParser:
 
             elif token.type == TokenType.ID:
                 self._advance()
-                simple_selectors.append(SimpleSelector(SimpleSelector.TYPE_ID, name=token.value))
+                simple_selectors.append(SimpleSelector(SimpleSelector.TYPE_ID, name=intern(token.value or "")))
 
             elif token.type == TokenType.CLASS:
                 self._advance()
-                simple_selectors.append(SimpleSelector(SimpleSelector.TYPE_CLASS, name=token.value))
+                simple_selectors.append(SimpleSelector(SimpleSelector.TYPE_CLASS, name=intern(token.value or "")))
 
             elif token.type == TokenType.ATTR_START:
                 simple_selectors.append(self._parse_attribute_selector())
@@ -488,13 +812,13 @@ class SelectorParser:
 
         if not simple_selectors:
             return None
-        return CompoundSelector(simple_selectors)
+        return CompoundSelector(_order_simple_selectors(simple_selectors))
 
     def _parse_attribute_selector(self) -> SimpleSelector:
         """Parse an attribute selector [attr], [attr=value], etc."""
         self._expect(TokenType.ATTR_START)
 
-        attr_name = self._expect(TokenType.TAG).value
+        attr_name = intern(self._expect(TokenType.TAG).value or "")
 
         token = self._peek()
         if token.type == TokenType.ATTR_END:
@@ -525,20 +849,43 @@ class SelectorParser:
 
 
 class SelectorMatcher:
-    """Matches selectors against DOM nodes."""
+    """Matches selectors against DOM nodes.
+
+    Element children (and their positions) are cached per parent, so a matcher
+    must not outlive changes to the DOM it is used on; the module functions use
+    a fresh one per call.
+    """
+
+    __slots__ = ("_element_children", "_elements_of_type", "_positions", "_type_positions")
+
+    _element_children: dict[int, list[Any]]
+    _elements_of_type: dict[tuple[int, str], list[Any]]
+    _positions: dict[int, int]
+    _type_positions: dict[int, int]
 
-    __slots__ = ()
+    def __init__(self) -> None:
+        # Keyed by id(parent) and id(element); only valid while the DOM is unchanged
+        self._element_children = {}
+        self._elements_of_type = {}
+        self._positions = {}
+        self._type_positions = {}
 
     def matches(self, node: Any, selector: ParsedSelector | CompoundSelector | SimpleSelector) -> bool:
         """Check if a node matches a parsed selector."""
-        if isinstance(selector, SelectorList):
-            return any(self.matches(node, sel) for sel in selector.selectors)
-        if isinstance(selector, ComplexSelector):
-            return self._matches_complex(node, selector)
-        if isinstance(selector, CompoundSelector):
-            return self._matches_compound(node, selector)
-        if isinstance(selector, SimpleSelector):
-            return self._matches_simple(node, selector)
+        match = _MATCH_METHODS.get(type(selector))
+        if match is not None:
+            return match(self, node, selector)
+        # Subclasses miss the exact-class lookup, so fall back to isinstance
+        for cls, method in _MATCH_METHODS.items():
+            if isinstance(selector, cls):
+                return method(self, node, selector)
+        return False
+
+    def _matches_list(self, node: Any, selector: SelectorList) -> bool:
+        """Match a selector list (any of its selectors must match)."""
+        for complex_selector in selector.selectors:
+            if self._matches_complex(node, complex_selector):
+                return True
         return False
 
     def _matches_complex(self, node: Any, selector: ComplexSelector) -> bool:
@@ -599,7 +946,16 @@ class SelectorMatcher:
 
     def _matches_compound(self, node: Any, compound: CompoundSelector) -> bool:
         """Match a compound selector (all simple selectors must match)."""
-        return all(self._matches_simple(node, simple) for simple in compound.selectors)
+        matchers = compound.matchers
+        if not matchers:
+            return True
+        # Text nodes and other non-element nodes don't match element selectors
+        if not hasattr(node, "name") or node.name.startswith("#"):
+            return False
+        for match in matchers:
+            if not match(node, self):
+                return False
+        return True
 
     def _matches_simple(self, node: Any, selector: SimpleSelector) -> bool:
         """Match a simple selector against a node."""
@@ -607,82 +963,14 @@ class SelectorMatcher:
         if not hasattr(node, "name") or node.name.startswith("#"):
             return False
 
-        sel_type = selector.type
-
-        if sel_type == SimpleSelector.TYPE_UNIVERSAL:
-            return True
-
-        if sel_type == SimpleSelector.TYPE_TAG:
-            # HTML tag names are case-insensitive
-            return bool(node.name.lower() == (selector.name.lower() if selector.name else ""))
-
-        if sel_type == SimpleSelector.TYPE_ID:
-            node_id = node.attrs.get("id", "") if node.attrs else ""
-            return node_id == selector.name
-
-        if sel_type == SimpleSelector.TYPE_CLASS:
-            class_attr = node.attrs.get("class", "") if node.attrs else ""
-            classes = class_attr.split() if class_attr else []
-            return selector.name in classes
-
-        if sel_type == SimpleSelector.TYPE_ATTR:
-            return self._matches_attribute(node, selector)
-
-        if sel_type == SimpleSelector.TYPE_PSEUDO:
-            return self._matches_pseudo(node, selector)
-
-        return False
-
-    def _matches_attribute(self, node: Any, selector: SimpleSelector) -> bool:
-        """Match an attribute selector."""
-        attrs = node.attrs or {}
-        attr_name = (selector.name or "").lower()  # Attribute names are case-insensitive in HTML
-
-        # Check if attribute exists (for any case)
-        attr_value: str | None = None
-        for name, value in attrs.items():
-            if name.lower() == attr_name:
-                attr_value = value
-                break
-
-        if attr_value is None:
-            return False
-
-        # Presence check only
-        if selector.operator is None:
-            return True
-
-        value = selector.value or ""
-        op = selector.operator
-
-        if op == "=":
-            return attr_value == value
-
-        if op == "~=":
-            # Space-separated word match
-            words = attr_value.split() if attr_value else []
-            return value in words
-
-        if op == "|=":
-            # Hyphen-separated prefix match (e.g., lang="en" matches lang|="en-US")
-            return attr_value == value or attr_value.startswith(value + "-")
-
-        if op == "^=":
-            # Starts with
-            return attr_value.startswith(value) if value else False
-
-        if op == "$=":
-            # Ends with
-            return attr_value.endswith(value) if value else False
-
-        if op == "*=":
-            # Contains
-            return value in attr_value if value else False
-
-        return False
+        return selector.match(node, self)
 
     def _matches_pseudo(self, node: Any, selector: SimpleSelector) -> bool:
-        """Match a pseudo-class selector."""
+        """Match a pseudo-class selector.
+
+        :nth-child(), :nth-of-type() and :not() are handled by
+        SimpleSelector.compile() and never reach here.
+        """
         name = (selector.name or "").lower()
 
         if name == "first-child":
@@ -691,16 +979,6 @@ class SelectorMatcher:
         if name == "last-child":
             return self._is_last_child(node)
 
-        if name == "nth-child":
-            return self._matches_nth_child(node, selector.arg)
-
-        if name == "not":
-            if not selector.arg:
-                return True
-            # Parse the inner selector
-            inner = parse_selector(selector.arg)
-            return not self.matches(node, inner)
-
         if name == "only-child":
             return self._is_first_child(node) and self._is_last_child(node)
 
@@ -730,9 +1008,6 @@ class SelectorMatcher:
         if name == "last-of-type":
             return self._is_last_of_type(node)
 
-        if name == "nth-of-type":
-            return self._matches_nth_of_type(node, selector.arg)
-
         if name == "only-of-type":
             return self._is_first_of_type(node) and self._is_last_of_type(node)
 
@@ -743,7 +1018,36 @@ class SelectorMatcher:
         """Get only element children (exclude text, comments, etc.)."""
         if not parent or not parent.has_child_nodes():
             return []
-        return [c for c in parent.children if hasattr(c, "name") and not c.name.startswith("#")]
+        # Positional pseudo-classes and sibling combinators ask for the same
+        # parent once per child, so build each list only once
+        key = id(parent)
+        elements = self._element_children.get(key)
+        if elements is None:
+            elements = [c for c in parent.children if hasattr(c, "name") and not c.name.startswith("#")]
+            self._element_children[key] = elements
+            positions = self._positions
+            for i, child in enumerate(elements):
+                positions[id(child)] = i
+        return elements
+
+    def _get_elements_of_type(self, parent: Any, node_name: str) -> list[Any]:
+        """Get the element children of parent named node_name (case-insensitively)."""
+        key = (id(parent), node_name)
+        elements = self._elements_of_type.get(key)
+        if elements is None:
+            elements = [c for c in self._get_element_children(parent) if c.name.lower() == node_name]
+            self._elements_of_type[key] = elements
+            positions = self._type_positions
+            for i, child in enumerate(elements):
+                positions[id(child)] = i
+        return elements
+
+    def _index_in(self, node: Any, elements: list[Any], positions: dict[int, int]) -> int:
+        # Position of node in elements, or -1 if it isn't there (e.g. detached)
+        i = positions.get(id(node), -1)
+        if i != -1 and i < len(elements) and elements[i] is node:
+            return i
+        return -1
 
     def _get_previous_sibling(self, node: Any) -> Any | None:
         """Get the previous element sibling. Returns None if node is first or not found."""
@@ -751,13 +1055,10 @@ class SelectorMatcher:
         if not parent:
             return None
 
-        prev: Any | None = None
-        for child in parent.children:
-            if child is node:
-                return prev
-            if hasattr(child, "name") and not child.name.startswith("#"):
-                prev = child
-        return None  # node not in parent.children (detached)
+        elements = self._get_element_children(parent)
+        i = self._index_in(node, elements, self._positions)
+        # i == -1 means node is not in parent.children (detached)
+        return elements[i - 1] if i > 0 else None
 
     def _is_first_child(self, node: Any) -> bool:
         """Check if node is the first element child of its parent."""
@@ -780,72 +1081,16 @@ class SelectorMatcher:
         parent = node.parent
         if not parent:
             return False
-        node_name = node.name.lower()
-        for child in self._get_element_children(parent):
-            if child.name.lower() == node_name:
-                return child is node
-        return False
+        elements = self._get_elements_of_type(parent, node.name.lower())
+        return bool(elements) and elements[0] is node
 
     def _is_last_of_type(self, node: Any) -> bool:
         """Check if node is the last sibling of its type."""
         parent = node.parent
         if not parent:
             return False
-        node_name = node.name.lower()
-        last_of_type: Any | None = None
-        for child in self._get_element_children(parent):
-            if child.name.lower() == node_name:
-                last_of_type = child
-        return last_of_type is node
-
-    def _parse_nth_expression(self, expr: str | None) -> tuple[int, int] | None:
-        """Parse an nth-child expression like '2n+1', 'odd', 'even', '3'."""
-        if not expr:
-            return None
-
-        expr = expr.strip().lower()
-
-        if expr == "odd":
-            return (2, 1)  # 2n+1
-        if expr == "even":
-            return (2, 0)  # 2n
-
-        # Parse An+B syntax
-        # Handle formats: n, 2n, 2n+1, -n+2, 3, etc.
-        a = 0
-        b = 0
-
-        # Remove all spaces
-        expr = expr.replace(" ", "")
-
-        if "n" in expr:
-            parts = expr.split("n")
-            a_part = parts[0]
-            b_part = parts[1] if len(parts) > 1 else ""
-
-            if a_part == "" or a_part == "+":
-                a = 1
-            elif a_part == "-":
-                a = -1
-            else:
-                try:
-                    a = int(a_part)
-                except ValueError:
-                    return None
-
-            if b_part:
-                try:
-                    b = int(b_part)
-                except ValueError:
-                    return None
-        else:
-            # Just a number
-            try:
-                b = int(expr)
-            except ValueError:
-                return None
-
-        return (a, b)
+        elements = self._get_elements_of_type(parent, node.name.lower())
+        return bool(elements) and elements[-1] is node
 
     def _matches_nth(self, index: int, a: int, b: int) -> bool:
         """Check if 1-based index matches An+B formula."""
@@ -859,47 +1104,41 @@ class SelectorMatcher:
         # a < 0: need diff <= 0 and diff divisible by abs(a)
         return diff <= 0 and diff % a == 0
 
-    def _matches_nth_child(self, node: Any, arg: str | None) -> bool:
+    def _matches_nth_child(self, node: Any, a: int, b: int) -> bool:
         """Match :nth-child(An+B)."""
         parent = node.parent
         if not parent:
             return False
 
-        parsed = self._parse_nth_expression(arg)
-        if parsed is None:
-            return False
-        a, b = parsed
-
-        elements = self._get_element_children(parent)
-        for i, child in enumerate(elements):
-            if child is node:
-                return self._matches_nth(i + 1, a, b)
-        return False
+        i = self._index_in(node, self._get_element_children(parent), self._positions)
+        return i != -1 and self._matches_nth(i + 1, a, b)
 
-    def _matches_nth_of_type(self, node: Any, arg: str | None) -> bool:
+    def _matches_nth_of_type(self, node: Any, a: int, b: int) -> bool:
         """Match :nth-of-type(An+B)."""
         parent = node.parent
         if not parent:
             return False
 
-        parsed = self._parse_nth_expression(arg)
-        if parsed is None:
-            return False
-        a, b = parsed
+        elements = self._get_elements_of_type(parent, node.name.lower())
+        i = self._index_in(node, elements, self._type_positions)
+        return i != -1 and self._matches_nth(i + 1, a, b)
 
-        node_name = node.name.lower()
-        elements = self._get_element_children(parent)
-        type_index = 0
-        for child in elements:
-            if child.name.lower() == node_name:
-                type_index += 1
-                if child is node:
-                    return self._matches_nth(type_index, a, b)
-        return False
+
+# SelectorMatcher.matches dispatches on the exact selector class with one lookup
+_MATCH_METHODS: dict[type, Callable[[SelectorMatcher, Any, Any], bool]] = {
+    SelectorList: SelectorMatcher._matches_list,
+    ComplexSelector: SelectorMatcher._matches_complex,
+    CompoundSelector: SelectorMatcher._matches_compound,
+    SimpleSelector: SelectorMatcher._matches_simple,
+}
 
 
+@lru_cache(maxsize=1024)
 def parse_selector(selector_string: str) -> ParsedSelector:
-    """Parse a CSS selector string into an AST."""
+    """Parse a CSS selector string into an AST.
+
+    Results are cached, so the returned AST is shared and must not be mutated.
+    """
     if not selector_string or not selector_string.strip():
         raise SelectorError("Empty selector")
 
@@ -909,10 +1148,6 @@ def parse_selector(selector_string: str) -> ParsedSelector:
     return parser.parse()
 
 
-# Global matcher instance
-_matcher: SelectorMatcher = SelectorMatcher()
-
-
 def query(root: Any, selector_string: str) -> list[Any]:
     """
     Query the DOM tree starting from root, returning all matching elements.
@@ -929,25 +1164,35 @@ def query(root: Any, selector_string: str) -> list[Any]:
     """
     selector = parse_selector(selector_string)
     results: list[Any] = []
-    _query_descendants(root, selector, results)
+    _query_descendants(root, selector, results, SelectorMatcher())
     return results
 
 
-def _query_descendants(node: Any, selector: ParsedSelector, results: list[Any]) -> None:
-    """Recursively search for matching nodes in descendants."""
-    # Only recurse into children (not the node itself)
-    if node.has_child_nodes():
-        for child in node.children:
-            # Check if this child matches
-            if hasattr(child, "name") and not child.name.startswith("#"):
-                if _matcher.matches(child, selector):
-                    results.append(child)
-            # Recurse into child's descendants
-            _query_descendants(child, selector, results)
-
-    # Also check template content if present
-    if hasattr(node, "template_content") and node.template_content:
-        _query_descendants(node.template_content, selector, results)
+def _query_descendants(root: Any, selector: ParsedSelector, results: list[Any], matcher: SelectorMatcher) -> None:
+    """Search the descendants of root (not root itself) for matching nodes, in document order."""
+    matches = matcher.matches
+    append = results.append
+    # Walk with an explicit stack: no Python frame per node, and no recursion
+    # limit on deeply nested documents
+    stack: list[Any] = [root]
+    while stack:
+        node = stack.pop()
+        name: str = node.name
+        if not name.startswith("#"):
+            if node is not root and matches(node, selector):
+                append(node)
+        elif name == "#text":
+            continue
+
+        # Pushed first so it is visited after the children. The content
+        # fragment itself is never an element, so only its descendants match.
+        template_content = node.template_content
+        if template_content:
+            stack.append(template_content)
+
+        children = node.children
+        if children:
+            stack.extend(reversed(children))
 
 
 def matches(node: Any, selector_string: str) -> bool:
@@ -962,4 +1207,79 @@ def matches(node: Any, selector_string: str) -> bool:
         True if the node matches, False otherwise
     """
     selector = parse_selector(selector_string)
-    return _matcher.matches(node, selector)
+    return SelectorMatcher().matches(node, selector)
+
+
+# Matches every element; used to list the elements a query would visit
+_ANY_ELEMENT: ParsedSelector = parse_selector("*")
+
+
+class SelectorIndex:
+    """Answers repeated queries on one subtree from a prebuilt element index.
+
+    Building the index walks the subtree once, recording its elements by tag
+    name, id and class. Each query then only matches the elements that share
+    the rightmost id, class or tag of the selector, instead of every element.
+    Results are the same as query(root, selector_string), in document order.
+
+    The index is a snapshot: build a new one after changing the DOM.
+    """
+
+    __slots__ = ("_by_class", "_by_id", "_by_tag", "_elements", "_matcher")
+
+    _elements: list[Any]
+    _by_tag: dict[str, list[Any]]
+    _by_id: dict[str, list[Any]]
+    _by_class: dict[str, list[Any]]
+    _matcher: SelectorMatcher
+
+    def __init__(self, root: Any) -> None:
+        self._elements = []
+        self._by_tag = {}
+        self._by_id = {}
+        self._by_class = {}
+        self._matcher = SelectorMatcher()
+        # Every element query(root, ...) would visit, in the same document order
+        _query_descendants(root, _ANY_ELEMENT, self._elements, self._matcher)
+
+        for element in self._elements:
+            self._by_tag.setdefault(element.name.lower(), []).append(element)
+            attrs = element.attrs
+            if attrs:
+                node_id = attrs.get("id")
+                if node_id is not None:
+                    self._by_id.setdefault(node_id, []).append(element)
+                class_attr = attrs.get("class")
+                if class_attr:
+                    for word in dict.fromkeys(class_attr.split()):
+                        self._by_class.setdefault(word, []).append(element)
+
+    def _candidates(self, selector: ComplexSelector) -> list[Any]:
+        """Elements that could match selector, narrowed by its rightmost compound."""
+        parts = selector.parts
+        # Unsupported pseudo-classes and :not() can raise while matching, so
+        # those selectors see every element, just like query() would
+        if any(_is_match_barrier(simple) for _, compound in parts for simple in compound.selectors):
+            return self._elements
+
+        simples = parts[-1][1].selectors
+        for simple in simples:
+            if simple.type == SimpleSelector.TYPE_ID:
+                return self._by_id.get(simple.name or "", [])
+        for simple in simples:
+            if simple.type == SimpleSelector.TYPE_CLASS:
+                return self._by_class.get(simple.name or "", [])
+        for simple in simples:
+            if simple.type == SimpleSelector.TYPE_TAG:
+                return self._by_tag.get((simple.name or "").lower(), [])
+        return self._elements
+
+    def query(self, selector_string: str) -> list[Any]:
+        """Return the indexed elements matching a CSS selector, in document order."""
+        selector = parse_selector(selector_string)
+        matcher = self._matcher
+        if not isinstance(selector, ComplexSelector):
+            # Selector groups need every element checked to keep document order
+            return [node for node in self._elements if matcher.matches(node, selector)]
+
+        return [node for node in self._candidates(selector) if matcher._matches_complex(node, selector)]
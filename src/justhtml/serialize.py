@@ -1,13 +1,15 @@
 """HTML serialization utilities for JustHTML DOM nodes."""
 
-# ruff: noqa: PERF401
-
 from __future__ import annotations
 
+import re
 from typing import Any
 
 from .constants import FOREIGN_ATTRIBUTE_ADJUSTMENTS, VOID_ELEMENTS
 
+# Characters that would terminate or make ambiguous an unquoted attribute value
+_UNQUOTED_ATTR_UNSAFE_PATTERN: re.Pattern[str] = re.compile(r"[>\"'= \t\n\f\r]")
+
 
 def _escape_text(text: str | None) -> str:
     if not text:
@@ -16,58 +18,32 @@ def _escape_text(text: str | None) -> str:
     return str(text).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
 
 
-def _choose_attr_quote(value: str | None) -> str:
-    if value is None:
-        return '"'
-    value = str(value)
-    if '"' in value and "'" not in value:
-        return "'"
-    return '"'
-
-
-def _escape_attr_value(value: str | None, quote_char: str) -> str:
-    if value is None:
-        return ""
-    value = str(value)
-    value = value.replace("&", "&amp;")
-    # Note: html5lib's default serializer does not escape '>' in attrs.
-    if quote_char == '"':
-        return value.replace('"', "&quot;")
-    return value.replace("'", "&#39;")
-
-
-def _can_unquote_attr_value(value: str | None) -> bool:
-    if value is None:
-        return False
-    value = str(value)
-    # html5lib's serializer unquotes aggressively; match fixture expectations.
-    # Disallow whitespace and characters that would terminate/ambiguate the value.
-    for ch in value:
-        if ch == ">":
-            return False
-        if ch in {'"', "'", "="}:
-            return False
-        if ch in {" ", "\t", "\n", "\f", "\r"}:
-            return False
-    return True
-
-
 def serialize_start_tag(name: str, attrs: dict[str, str | None] | None) -> str:
-    attrs = attrs or {}
+    if not attrs:
+        return f"<{name}>"
     parts: list[str] = ["<", name]
-    if attrs:
-        for key, value in attrs.items():
-            if value is None or value == "":
-                parts.extend([" ", key])
-            else:
-                if _can_unquote_attr_value(value):
-                    escaped = str(value).replace("&", "&amp;")
-                    parts.extend([" ", key, "=", escaped])
-                else:
-                    quote = _choose_attr_quote(value)
-                    escaped = _escape_attr_value(value, quote)
-                    parts.extend([" ", key, "=", quote, escaped, quote])
-    parts.append(">")
+    append = parts.append
+    # html5lib's serializer unquotes aggressively; match fixture expectations.
+    # Otherwise prefer single quotes only when that avoids escaping. Note that
+    # html5lib's default serializer does not escape '>' in attrs.
+    for key, value in attrs.items():
+        append(" ")
+        append(key)
+        if value is None or value == "":
+            continue
+        escaped = str(value).replace("&", "&amp;")
+        if _UNQUOTED_ATTR_UNSAFE_PATTERN.search(escaped) is None:
+            append("=")
+            append(escaped)
+        elif '"' in escaped and "'" not in escaped:
+            append("='")
+            append(escaped)
+            append("'")
+        else:
+            append('="')
+            append(escaped.replace('"', "&quot;"))
+            append('"')
+    append(">")
     return "".join(parts)
 
 
@@ -77,77 +53,136 @@ def serialize_end_tag(name: str) -> str:
 
 def to_html(node: Any, indent: int = 0, indent_size: int = 2, *, pretty: bool = True) -> str:
     """Convert node to HTML string."""
-    if node.name == "#document":
-        # Document root - just render children
+    if not pretty:
         parts: list[str] = []
+        if node.name == "#document":
+            for child in node.children or []:
+                _node_to_compact_html(child, parts)
+        else:
+            _node_to_compact_html(node, parts)
+        return "".join(parts)
+
+    parts = []
+    prefix = " " * (indent * indent_size)
+    indent_step = " " * indent_size
+    if node.name == "#document":
+        # Document root - just render children, one per line
+        for i, child in enumerate(node.children or []):
+            if i:
+                parts.append("\n")
+            _node_to_pretty_html(child, parts, prefix, indent_step)
+    else:
+        _node_to_pretty_html(node, parts, prefix, indent_step)
+    return "".join(parts)
+
+
+def _node_to_compact_html(node: Any, parts: list[str]) -> None:
+    """Append the non-pretty HTML for a node to parts."""
+    name: str = node.name
+
+    if name == "#text":
+        if node.data:
+            parts.append(_escape_text(node.data))
+        return
+
+    if name == "#comment":
+        parts.append(f"<!--{node.data or ''}-->")
+        return
+
+    if name == "!doctype":
+        parts.append("<!DOCTYPE html>")
+        return
+
+    if name == "#document-fragment":
         for child in node.children or []:
-            parts.append(_node_to_html(child, indent, indent_size, pretty))
-        return "\n".join(parts) if pretty else "".join(parts)
-    return _node_to_html(node, indent, indent_size, pretty)
+            _node_to_compact_html(child, parts)
+        return
 
+    parts.append(serialize_start_tag(name, node.attrs))
+    if name in VOID_ELEMENTS:
+        return
+    for child in node.children or []:
+        _node_to_compact_html(child, parts)
+    parts.append(f"</{name}>")
 
-def _node_to_html(node: Any, indent: int = 0, indent_size: int = 2, pretty: bool = True) -> str:
-    """Helper to convert a node to HTML."""
-    prefix = " " * (indent * indent_size) if pretty else ""
-    newline = "\n" if pretty else ""
+
+def _node_to_pretty_html(node: Any, parts: list[str], prefix: str, indent_step: str) -> None:
+    """Append the pretty-printed HTML for a node to parts.
+
+    prefix is the node's indentation; children are indented by a further
+    indent_step, so each level's prefix is built once rather than per node.
+    Appends nothing for nodes that render empty (whitespace-only text), so
+    callers can tell whether a line was written.
+    """
     name: str = node.name
 
     # Text node
     if name == "#text":
         text: str | None = node.data
-        if pretty:
-            text = text.strip() if text else ""
-            if text:
-                return f"{prefix}{_escape_text(text)}"
-            return ""
-        return _escape_text(text) if text else ""
+        text = text.strip() if text else ""
+        if text:
+            parts.append(prefix)
+            parts.append(_escape_text(text))
+        return
 
     # Comment node
     if name == "#comment":
-        return f"{prefix}<!--{node.data or ''}-->"
+        parts.append(f"{prefix}<!--{node.data or ''}-->")
+        return
 
     # Doctype
     if name == "!doctype":
-        return f"{prefix}<!DOCTYPE html>"
+        parts.append(f"{prefix}<!DOCTYPE html>")
+        return
 
-    # Document fragment
+    # Document fragment: children at the same level, one per line
     if name == "#document-fragment":
-        parts: list[str] = []
-        for child in node.children or []:
-            child_html = _node_to_html(child, indent, indent_size, pretty)
-            if child_html:
-                parts.append(child_html)
-        return newline.join(parts) if pretty else "".join(parts)
+        start = len(parts)
+        _children_to_pretty_html(node.children or [], parts, prefix, indent_step)
+        if len(parts) > start:
+            # No newline before the first child
+            del parts[start]
+        return
 
     # Element node
     attrs: dict[str, str | None] = node.attrs or {}
 
     # Build opening tag
-    open_tag = serialize_start_tag(name, attrs)
+    parts.append(prefix)
+    parts.append(serialize_start_tag(name, attrs))
 
     # Void elements
     if name in VOID_ELEMENTS:
-        return f"{prefix}{open_tag}"
+        return
 
     # Elements with children
     children: list[Any] = node.children or []
     if not children:
-        return f"{prefix}{open_tag}{serialize_end_tag(name)}"
+        parts.append(serialize_end_tag(name))
+        return
 
     # Check if all children are text-only (inline rendering)
-    all_text = all(c.name == "#text" for c in children)
-
-    if all_text and pretty:
-        return f"{prefix}{open_tag}{_escape_text(node.to_text(separator='', strip=False))}{serialize_end_tag(name)}"
+    if all(c.name == "#text" for c in children):
+        parts.append(_escape_text(node.to_text(separator="", strip=False)))
+        parts.append(serialize_end_tag(name))
+        return
 
     # Render with child indentation
-    parts = [f"{prefix}{open_tag}"]
+    _children_to_pretty_html(children, parts, prefix + indent_step, indent_step)
+    parts.append("\n")
+    parts.append(prefix)
+    parts.append(serialize_end_tag(name))
+
+
+def _children_to_pretty_html(children: list[Any], parts: list[str], prefix: str, indent_step: str) -> None:
+    """Append each child's pretty HTML to parts on its own line, skipping empty ones."""
     for child in children:
-        child_html = _node_to_html(child, indent + 1, indent_size, pretty)
-        if child_html:
-            parts.append(child_html)
-    parts.append(f"{prefix}{serialize_end_tag(name)}")
-    return newline.join(parts) if pretty else "".join(parts)
+        mark = len(parts)
+        parts.append("\n")
+        _node_to_pretty_html(child, parts, prefix, indent_step)
+        if len(parts) == mark + 1:
+            # The child rendered nothing, so it doesn't get a line
+            parts.pop()
 
 
 def to_test_format(node: Any, indent: int = 0) -> str:
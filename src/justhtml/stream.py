@@ -1,9 +1,10 @@
 from __future__ import annotations
 
+from collections import deque
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
-    from collections.abc import Generator
+    from collections.abc import Callable, Generator
 
 from .encoding import decode_html
 from .tokenizer import Tokenizer
@@ -20,47 +21,65 @@ class _DummyNode:
 class StreamSink:
     """A sink that buffers tokens for the stream API."""
 
-    tokens: list[StreamEvent]
+    tokens: deque[StreamEvent]
     open_elements: list[_DummyNode]
+    _text_buf: list[str]
 
     def __init__(self) -> None:
-        self.tokens = []
+        self.tokens = deque()
         self.open_elements = []  # Required by tokenizer for rawtext checks
+        self._text_buf = []
 
     def process_token(self, token: Tag | CommentToken | DoctypeToken | Any) -> int:
-        # Tokenizer reuses token objects, so we must copy data
-        if isinstance(token, Tag):
-            # Copy tag data
-            self.tokens.append(
-                (
-                    "start" if token.kind == Tag.START else "end",
-                    (token.name, token.attrs.copy()) if token.kind == Tag.START else token.name,
-                )
-            )
-            # Maintain open_elements stack for tokenizer's rawtext checks
-            if token.kind == Tag.START:
-                # We need a dummy object with namespace for tokenizer checks
-                # Tokenizer checks: stack[-1].namespace
-                # We can just use a simple object
-                self.open_elements.append(_DummyNode())
-            else:  # Tag.END
-                if self.open_elements:
-                    self.open_elements.pop()
-                # If open_elements is empty, we ignore the end tag for rawtext tracking purposes
-                # (it's an unmatched end tag at the root level)
-
-        elif isinstance(token, CommentToken):
-            self.tokens.append(("comment", token.data))
-
-        elif isinstance(token, DoctypeToken):
-            dt = token.doctype
-            self.tokens.append(("doctype", (dt.name, dt.public_id, dt.system_id)))
-
+        if self._text_buf:
+            self.flush_text()
+        # One dict lookup on the exact token class; other tokens (EOF) are ignored
+        handler = _TOKEN_HANDLERS.get(type(token))
+        if handler is not None:
+            handler(self, token)
         return 0  # TokenSinkResult.Continue
 
     def process_characters(self, data: str) -> None:
         """Handle character data from tokenizer."""
-        self.tokens.append(("text", data))
+        # Adjacent character runs are coalesced into a single text event
+        self._text_buf.append(data)
+
+    def flush_text(self) -> None:
+        """Emit any buffered character data as one text event."""
+        if self._text_buf:
+            self.tokens.append(("text", "".join(self._text_buf)))
+            self._text_buf.clear()
+
+
+def _handle_tag(sink: StreamSink, token: Tag) -> None:
+    # Tokenizer reuses token objects, so we must copy data. The attrs dict
+    # itself is handed off fresh for every tag, so it can be kept as is.
+    if token.kind == Tag.START:
+        sink.tokens.append(("start", (token.name, token.attrs)))
+        # Maintain open_elements stack for tokenizer's rawtext checks.
+        # Tokenizer checks stack[-1].namespace, so a dummy object will do.
+        sink.open_elements.append(_DummyNode())
+    else:  # Tag.END
+        sink.tokens.append(("end", token.name))
+        # An unmatched end tag at the root level is ignored for rawtext tracking
+        if sink.open_elements:
+            sink.open_elements.pop()
+
+
+def _handle_comment(sink: StreamSink, token: CommentToken) -> None:
+    sink.tokens.append(("comment", token.data))
+
+
+def _handle_doctype(sink: StreamSink, token: DoctypeToken) -> None:
+    dt = token.doctype
+    sink.tokens.append(("doctype", (dt.name, dt.public_id, dt.system_id)))
+
+
+_TOKEN_HANDLERS: dict[type, Callable[[StreamSink, Any], None]] = {
+    Tag: _handle_tag,
+    CommentToken: _handle_comment,
+    DoctypeToken: _handle_doctype,
+}
 
 
 def stream(
@@ -80,28 +99,17 @@ def stream(
     sink = StreamSink()
     tokenizer = Tokenizer(sink)
     tokenizer.initialize(html_str)
+    tokens = sink.tokens
 
     while True:
         # Run one step of the tokenizer
         is_eof = tokenizer.step()
+        if is_eof:
+            sink.flush_text()
 
         # Yield any tokens produced by this step
-        if sink.tokens:
-            # Coalesce text tokens
-            text_buffer: list[str] = []
-            for event, data in sink.tokens:
-                if event == "text":
-                    text_buffer.append(data)
-                else:
-                    if text_buffer:
-                        yield ("text", "".join(text_buffer))
-                        text_buffer = []
-                    yield (event, data)
-
-            if text_buffer:
-                yield ("text", "".join(text_buffer))
-
-            sink.tokens.clear()
+        while tokens:
+            yield tokens.popleft()
 
         if is_eof:
             break
@@ -2,13 +2,14 @@ from __future__ import annotations
 
 import re
 from bisect import bisect_right
+from sys import intern
 from typing import TYPE_CHECKING, Any
 
 if TYPE_CHECKING:
     from collections.abc import Callable
 
 from .entities import decode_entities_in_text
-from .errors import generate_error_message
+from .errors import StrictModeError, generate_error_message
 from .tokens import CommentToken, Doctype, DoctypeToken, EOFToken, ParseError, Tag
 
 _ATTR_VALUE_UNQUOTED_TERMINATORS = "\t\n\f >&\"'<=`\r\0"
@@ -94,6 +95,12 @@ class TokenizerOpts:
         self.initial_rawtext_tag = initial_rawtext_tag
         self.xml_coercion = bool(xml_coercion)
 
+    def copy(self, **overrides: Any) -> TokenizerOpts:
+        """Return a copy of these options, with any given fields replaced."""
+        fields = {name: getattr(self, name) for name in self.__slots__}
+        fields.update(overrides)
+        return TokenizerOpts(**fields)
+
 
 class Tokenizer:
     DATA = 0
@@ -191,6 +198,7 @@ class Tokenizer:
         "reconsume",
         "sink",
         "state",
+        "strict",
         "temp_buffer",
         "text_buffer",
         "text_start_pos",
@@ -228,16 +236,25 @@ class Tokenizer:
     reconsume: bool
     sink: Any
     state: int
+    strict: bool
     temp_buffer: list[str]
     text_buffer: list[str]
     text_start_pos: int
 
     # _STATE_HANDLERS is defined at the end of the file
 
-    def __init__(self, sink: Any, opts: TokenizerOpts | None = None, collect_errors: bool = False) -> None:
+    def __init__(
+        self,
+        sink: Any,
+        opts: TokenizerOpts | None = None,
+        collect_errors: bool = False,
+        strict: bool = False,
+    ) -> None:
         self.sink = sink
         self.opts = opts or TokenizerOpts()
-        self.collect_errors = collect_errors
+        # Strict mode raises on the first error, so it needs errors collected
+        self.strict = strict
+        self.collect_errors = collect_errors or strict
         self.errors = []
 
         self.state = self.DATA
@@ -341,9 +358,10 @@ class Tokenizer:
 
     def run(self, html: str | None) -> None:
         self.initialize(html)
-        while True:
-            if self.step():
-                break
+        # Same as calling step() until it returns True, without the extra call per state.
+        handlers = self._STATE_HANDLERS  # type: ignore[attr-defined]
+        while not handlers[self.state](self):
+            pass
 
     # ---------------------
     # Helper methods
@@ -1798,6 +1816,9 @@ class Tokenizer:
             name = name_parts[0]
         else:
             name = "".join(name_parts)
+        # Tag names repeat heavily and end up on every element node; interning
+        # shares one string per name and lets comparisons hit the identity check.
+        name = intern(name)
         attrs = self.current_tag_attrs
         self.current_tag_attrs = {}
 
@@ -1924,7 +1945,10 @@ class Tokenizer:
 
         message = generate_error_message(code)
         line = self._get_line_at_pos(self.pos)
-        self.errors.append(ParseError(code, line=line, column=column, message=message, source_html=self.buffer))
+        error = ParseError(code, line=line, column=column, message=message, source_html=self.buffer)
+        if self.strict:
+            raise StrictModeError(error)
+        self.errors.append(error)
 
     def _consume_if(self, literal: str) -> bool:
         end = self.pos + len(literal)
@@ -154,16 +154,24 @@ class ParseError:
             exc.msg = self.message
             return exc
 
-        # Split HTML into lines
-        lines = self._source_html.split("\n")
-        if self.line < 1 or self.line > len(lines):
+        # Find the line with the error (1-indexed) without splitting the whole document
+        source = self._source_html
+        line_start = 0
+        valid_line = self.line >= 1
+        for _ in range(self.line - 1):
+            newline = source.find("\n", line_start)
+            if newline == -1:
+                valid_line = False
+                break
+            line_start = newline + 1
+        if not valid_line:
             # Invalid line number
             exc = SyntaxError(self.message)
             exc.msg = self.message
             return exc
 
-        # Get the line with the error (1-indexed line -> 0-indexed array)
-        error_line = lines[self.line - 1]
+        line_end = source.find("\n", line_start)
+        error_line = source[line_start:] if line_end == -1 else source[line_start:line_end]
 
         # Create SyntaxError with location information
         exc = SyntaxError(self.message)
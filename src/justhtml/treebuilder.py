@@ -130,7 +130,7 @@ class TreeBuilder(TreeBuilderModesMixin):
             # Set mode based on context element name
             namespace = fragment_context.namespace
             context_name = fragment_context.tag_name or ""
-            name = context_name.lower()
+            name = fragment_context.tag_name_lower
 
             # Create a fake context element to establish foreign content context
             # Per spec: "Create an element for the token in the given namespace"
@@ -496,7 +496,7 @@ class TreeBuilder(TreeBuilderModesMixin):
     # Insertion mode dispatch ------------------------------------------------
 
     def _append_comment_to_document(self, text: str) -> None:
-        node = SimpleDomNode("#comment", data=text)
+        node = SimpleDomNode.new_comment(text)
         self.document.append_child(node)
 
     def _append_comment(self, text: str, parent: Any | None = None) -> None:
@@ -505,7 +505,7 @@ class TreeBuilder(TreeBuilderModesMixin):
         # If parent is a template, insert into its content fragment
         if type(parent) is TemplateNode and parent.template_content:
             parent = parent.template_content
-        node = SimpleDomNode("#comment", data=text)
+        node = SimpleDomNode.new_comment(text)
         parent.append_child(node)
 
     def _append_text(self, text: str) -> None:
@@ -552,8 +552,7 @@ class TreeBuilder(TreeBuilderModesMixin):
             return
 
         node = TextNode(text)
-        reference_node = parent.children[position] if position < len(parent.children) else None
-        parent.insert_before(node, reference_node)
+        self._insert_node_at(parent, position, node)
 
     def _current_node_or_html(self) -> Any:
         if self.open_elements:
@@ -803,10 +802,14 @@ class TreeBuilder(TreeBuilderModesMixin):
             index += 1
 
     def _insert_node_at(self, parent: Any, index: int, node: Any) -> None:
-        reference_node = None
-        if index is not None and index < len(parent.children):
-            reference_node = parent.children[index]
-        parent.insert_before(node, reference_node)
+        # Insert at the known position directly rather than via insert_before(),
+        # which would search the children again for the reference node.
+        children = parent.children
+        if index is not None and index < len(children):
+            children.insert(index, node)
+            node.parent = parent
+            return
+        parent.append_child(node)
 
     def _find_last_on_stack(self, name: str) -> Any | None:
         for node in reversed(self.open_elements):
@@ -27,7 +27,7 @@ class TreeBuilderModesMixin:
         doctype = token.doctype
         parse_error, quirks_mode = doctype_error_and_quirks(doctype, self.iframe_srcdoc)
 
-        node = SimpleDomNode("!doctype", data=doctype)
+        node = SimpleDomNode.new_doctype(doctype)
         self.document.append_child(node)
 
         if parse_error:
@@ -1206,7 +1206,7 @@ class TreeBuilderModesMixin:
                     return None
                 if (
                     self.fragment_context
-                    and self.fragment_context.tag_name.lower() == "colgroup"
+                    and self.fragment_context.tag_name_lower == "colgroup"
                     and not self._has_in_table_scope("table")
                 ):
                     self._parse_error("unexpected-start-tag-in-column-group", tag_name=name)
@@ -1278,7 +1278,7 @@ class TreeBuilderModesMixin:
                         self.fragment_context
                         and current
                         and current.name == "html"
-                        and self.fragment_context.tag_name.lower() in {"tbody", "tfoot", "thead"}
+                        and self.fragment_context.tag_name_lower in {"tbody", "tfoot", "thead"}
                     ):
                         self._parse_error("unexpected-start-tag")
                         return None
@@ -1310,7 +1310,7 @@ class TreeBuilderModesMixin:
                     self.fragment_context
                     and current
                     and current.name == "html"
-                    and self.fragment_context.tag_name.lower() in {"tbody", "tfoot", "thead"}
+                    and self.fragment_context.tag_name_lower in {"tbody", "tfoot", "thead"}
                 ):
                     self._parse_error("unexpected-end-tag", tag_name=token.name)
                     return None
@@ -1715,7 +1715,7 @@ class TreeBuilderModesMixin:
             if self.fragment_context is not None:
                 # html is always on stack in fragment parsing
                 html_node = self._find_last_on_stack("html")
-                html_node.append_child(SimpleDomNode("#comment", data=token.data))
+                html_node.append_child(SimpleDomNode.new_comment(token.data))
                 return None
             self._append_comment_to_document(token.data)
             return None
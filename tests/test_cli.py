@@ -1,14 +1,14 @@
 import sys
 import unittest
 from contextlib import redirect_stderr, redirect_stdout
-from io import StringIO
+from io import BytesIO, StringIO, TextIOWrapper
 from tempfile import NamedTemporaryFile
 
 import justhtml.__main__ as cli
 
 
 class TestCLI(unittest.TestCase):
-    def _run_cli(self, argv, stdin_text=""):
+    def _run_cli(self, argv, stdin_text="", stdin_bytes=None):
         stdout = StringIO()
         stderr = StringIO()
 
@@ -16,7 +16,9 @@ class TestCLI(unittest.TestCase):
         old_stdin = sys.stdin
         try:
             sys.argv = ["justhtml", *argv]
-            sys.stdin = StringIO(stdin_text)
+            if stdin_bytes is None:
+                stdin_bytes = stdin_text.encode("utf-8")
+            sys.stdin = TextIOWrapper(BytesIO(stdin_bytes))
             with redirect_stdout(stdout), redirect_stderr(stderr):
                 try:
                     cli.main()
@@ -56,6 +58,27 @@ class TestCLI(unittest.TestCase):
         self.assertIn("world", out)
         self.assertEqual(err, "")
 
+    def test_stdin_bytes_are_sniffed(self):
+        html = '<meta charset="iso-8859-2"><p>\xb1</p>'.encode("latin-1")
+        code, out, err = self._run_cli(["-", "--selector", "p", "--format", "text"], stdin_bytes=html)
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "\u0105\n")
+        self.assertEqual(err, "")
+
+    def test_stdin_undeclared_bytes_default_to_utf8(self):
+        html = "<p>h\u00e9llo \u00c1rbol and \u0150</p>".encode()
+        code, out, err = self._run_cli(["-", "--format", "text"], stdin_bytes=html)
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "h\u00e9llo \u00c1rbol and \u0150\n")
+        self.assertEqual(err, "")
+
+    def test_stdin_invalid_bytes_do_not_crash(self):
+        html = b"<p>a\xffb</p>"
+        code, out, err = self._run_cli(["-", "--format", "text"], stdin_bytes=html)
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "a\ufffdb\n")
+        self.assertEqual(err, "")
+
     def test_selector_text_multiple_matches(self):
         html = "<article><p>Hi <b>there</b></p><p>Bye</p></article>"
         code, out, err = self._run_cli(["-", "--selector", "p", "--format", "text"], stdin_text=html)
@@ -94,6 +117,52 @@ class TestCLI(unittest.TestCase):
         self.assertEqual(out, "")
         self.assertNotEqual(err, "")
 
+    def test_invalid_selector_exits_before_reading_input(self):
+        code, out, err = self._run_cli(["/does/not/exist.html", "--selector", "["])
+        self.assertEqual(code, 2)
+        self.assertEqual(out, "")
+        self.assertNotEqual(err, "")
+
+    def test_unsupported_pseudo_class_exits_2(self):
+        html = "<p>Hello</p>"
+        code, out, err = self._run_cli(["-", "--selector", "p:hover"], stdin_text=html)
+        self.assertEqual(code, 2)
+        self.assertEqual(out, "")
+        self.assertIn("hover", err)
+
+    def test_file_input_is_sniffed(self):
+        html = '<meta charset="iso-8859-2"><p>\xb1</p>'.encode("latin-1")
+        with NamedTemporaryFile("wb+", suffix=".html") as f:
+            f.write(html)
+            f.flush()
+            code, out, err = self._run_cli([f.name, "--selector", "p", "--format", "text"])
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "\u0105\n")
+        self.assertEqual(err, "")
+
+    def test_file_input_undeclared_bytes_default_to_utf8(self):
+        html = "<p>h\u00e9llo \u00c1rbol and \u0150</p>".encode()
+        with NamedTemporaryFile("wb+", suffix=".html") as f:
+            f.write(html)
+            f.flush()
+            code, out, err = self._run_cli([f.name, "--format", "text"])
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "h\u00e9llo \u00c1rbol and \u0150\n")
+        self.assertEqual(err, "")
+
+    def test_encoding_overrides_sniffing(self):
+        html = "<p>h\u00e9llo</p>".encode()
+        code, out, err = self._run_cli(["-", "--format", "text", "--encoding", "utf-8"], stdin_bytes=html)
+        self.assertEqual(code, 0)
+        self.assertEqual(out, "h\u00e9llo\n")
+        self.assertEqual(err, "")
+
+    def test_unsupported_encoding_exits_2(self):
+        code, out, err = self._run_cli(["-", "--encoding", "koi8-r"], stdin_text="<p>x</p>")
+        self.assertEqual(code, 2)
+        self.assertEqual(out, "")
+        self.assertIn("koi8-r", err)
+
     def test_file_input_path(self):
         html = "<p>Hello</p>"
         with NamedTemporaryFile("w+", suffix=".html") as f:
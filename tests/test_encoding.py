@@ -64,11 +64,32 @@ class TestEncoding(unittest.TestCase):
         self.assertIsNone(enc._prescan_for_meta_charset(b"<meta charset"))
         self.assertIsNone(enc._prescan_for_meta_charset(b"<meta charset=utf-8"))
 
+    def test_prescan_scan_budget(self):
+        # Meta declarations past the first 1024 non-comment bytes are ignored.
+        self.assertIsNone(enc._prescan_for_meta_charset(b"x" * 1024 + b"<meta charset=iso8859-2>"))
+        self.assertEqual(enc._prescan_for_meta_charset(b"x" * 1000 + b"<meta charset=iso8859-2>"), "iso-8859-2")
+
+        # A '>' inside a quoted attribute value does not end a skipped tag.
+        self.assertEqual(enc._prescan_for_meta_charset(b"<p title='>'><meta charset=iso8859-2>"), "iso-8859-2")
+
+        # An unterminated quote in a skipped tag consumes the rest of the input.
+        self.assertIsNone(enc._prescan_for_meta_charset(b"<p title='><meta charset=iso8859-2>"))
+
     def test_decode_html_branches(self):
         text, name = decode_html(b"\x80")
         self.assertEqual(text, "\u20ac")
         self.assertEqual(name, "windows-1252")
 
+        # Bytes that Python's cp1252 leaves undefined decode to C1 controls, as in browsers.
+        text, name = decode_html(b"a\x81b\x8d\x8f\x90\x9d\x80")
+        self.assertEqual(text, "a\x81b\x8d\x8f\x90\x9d\u20ac")
+        self.assertEqual(name, "windows-1252")
+        self.assertEqual(decode_html(memoryview(b"\x80\x81"))[0], "\u20ac\x81")
+
+        # The fallback encoding only applies when nothing is declared.
+        self.assertEqual(decode_html(b"\xc3\x81", default_encoding="utf-8"), ("\u00c1", "utf-8"))
+        self.assertEqual(decode_html(b"<meta charset=iso8859-2>", default_encoding="utf-8")[1], "iso-8859-2")
+
         text, name = decode_html(b"abc", transport_encoding="iso-8859-2")
         self.assertEqual(text, "abc")
         self.assertEqual(name, "iso-8859-2")
@@ -77,6 +98,19 @@ class TestEncoding(unittest.TestCase):
         self.assertEqual(text, "abc")
         self.assertEqual(name, "euc-jp")
 
+        # Non-ASCII input goes through the encoding's own codec.
+        text, name = decode_html(b"\xe9", transport_encoding="iso-8859-2")
+        self.assertEqual(text, "\u00e9")
+        self.assertEqual(name, "iso-8859-2")
+
+        text, name = decode_html(b"\xa4\xa2", transport_encoding="euc-jp")
+        self.assertEqual(text, "\u3042")
+        self.assertEqual(name, "euc-jp")
+
+        text, name = decode_html(b"caf\xc3\xa9", transport_encoding="utf-8")
+        self.assertEqual(text, "caf\u00e9")
+        self.assertEqual(name, "utf-8")
+
         text, name = decode_html(b"\xff\xfeh\x00i\x00")
         self.assertEqual(text, "hi")
         self.assertEqual(name, "utf-16le")
@@ -93,6 +127,26 @@ class TestEncoding(unittest.TestCase):
         self.assertEqual(text, "hi")
         self.assertEqual(name, "utf-8")
 
+    def test_decode_html_buffer_inputs(self):
+        data = b"\xef\xbb\xbf<meta charset=iso8859-2><p>\xc3\xa9</p>"
+        expected = decode_html(data)
+        self.assertEqual(expected, ("<meta charset=iso8859-2><p>\u00e9</p>", "utf-8"))
+        self.assertEqual(decode_html(bytearray(data)), expected)
+        self.assertEqual(decode_html(memoryview(data)), expected)
+
+        # The meta prescan also runs for memoryview input.
+        self.assertEqual(decode_html(memoryview(b"<meta charset=iso8859-2>\xe9"))[1], "iso-8859-2")
+
+        # Non-byte formats and non-contiguous views decode their raw bytes.
+        wide = memoryview(b"hi").cast("H")
+        self.assertEqual(decode_html(wide), ("hi", "windows-1252"))
+        self.assertEqual(decode_html(memoryview(b"h-i-")[::2]), ("hi", "windows-1252"))
+
+        # Sniffing a memoryview only copies the prescan window.
+        view = memoryview(b"\xef\xbb\xbf" + b"x" * 200000)
+        self.assertEqual(sniff_html_encoding(view), ("utf-8", 3))
+        self.assertEqual(sniff_html_encoding(memoryview(b"<meta charset=iso8859-2>").cast("H")), ("iso-8859-2", 0))
+
     def test_internal_helpers(self):
         self.assertIsNone(enc._strip_ascii_whitespace(None))
 
@@ -106,6 +160,16 @@ class TestEncoding(unittest.TestCase):
             enc._prescan_for_meta_charset(b'<meta http-equiv="Content-Type" content="text/html; charset=bogus">')
         )
 
+    def test_sniff_encoding(self):
+        data = b"<meta charset=iso8859-2><p>\xe9</p>"
+        self.assertEqual(JustHTML.sniff_encoding(data), "iso-8859-2")
+        self.assertEqual(JustHTML.sniff_encoding(memoryview(data)), "iso-8859-2")
+        self.assertEqual(JustHTML.sniff_encoding(b"\xef\xbb\xbfhi"), "utf-8")
+        self.assertEqual(JustHTML.sniff_encoding(b"hi"), "windows-1252")
+
+        doc = JustHTML(data, encoding=JustHTML.sniff_encoding(data))
+        self.assertEqual(doc.root.to_text(), "é")
+
     def test_parser_accepts_bytes(self):
         doc = JustHTML(b"<p>hi</p>")
         self.assertEqual(doc.root.children[0].name, "html")
@@ -3,6 +3,7 @@
 import unittest
 
 from justhtml import JustHTML, ParseError, StrictModeError
+from justhtml.errors import generate_error_message
 from justhtml.tokenizer import Tokenizer
 from justhtml.tokens import CharacterTokens, Tag
 from justhtml.treebuilder import TreeBuilder
@@ -24,6 +25,15 @@ class TestErrorCollection(unittest.TestCase):
         assert len(doc.errors) > 0
         assert all(isinstance(e, ParseError) for e in doc.errors)
 
+    def test_errors_list_is_not_shared_with_parser(self):
+        """doc.errors is a new list, separate from the tokenizer and tree builder lists."""
+        doc = JustHTML("<p>\x00</p>", collect_errors=True)
+        assert doc.errors
+        assert doc.errors is not doc.tokenizer.errors
+        assert doc.errors is not doc.tree_builder.errors
+        doc.errors.clear()
+        assert doc.tokenizer.errors
+
     def test_error_has_line_and_column(self):
         """Errors include line and column information."""
         doc = JustHTML("<p>\x00</p>", collect_errors=True)
@@ -102,6 +112,34 @@ class TestStrictMode(unittest.TestCase):
         assert error.line is not None
         assert error.column is not None
 
+    def test_strict_mode_prefers_tokenizer_errors(self):
+        """Tokenizer errors are raised as soon as they are found."""
+        with self.assertRaises(StrictModeError) as ctx:
+            JustHTML("<p>x</p>\x00<p>", strict=True)
+        assert ctx.exception.error.code == "unexpected-null-character"
+
+        with self.assertRaises(StrictModeError) as ctx:
+            JustHTML("<p>x</p>", strict=True)
+        assert ctx.exception.error.code == "expected-doctype-but-got-start-tag"
+
+
+class TestErrorMessages(unittest.TestCase):
+    """Test human-readable error message generation."""
+
+    def test_message_includes_tag_name(self):
+        """Tag-bearing messages include the tag name."""
+        assert generate_error_message("unexpected-end-tag", "div") == "Unexpected </div> end tag"
+        assert generate_error_message("unexpected-null-character") == "Unexpected NULL character (U+0000)"
+
+    def test_unknown_code_falls_back_to_code(self):
+        """Unknown codes are returned unchanged."""
+        assert generate_error_message("not-a-real-error", "div") == "not-a-real-error"
+
+    def test_messages_are_cached(self):
+        """Repeated errors reuse the cached message string."""
+        first = generate_error_message("unexpected-start-tag", "span")
+        assert generate_error_message("unexpected-start-tag", "span") is first
+
 
 class TestParseError(unittest.TestCase):
     """Test ParseError class behavior."""
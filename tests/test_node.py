@@ -29,6 +29,19 @@ class TestNode(unittest.TestCase):
         parent.remove_child(child)
         assert child.parent is None
 
+    def test_new_comment_matches_constructor(self):
+        node = SimpleDomNode.new_comment("c")
+        expected = SimpleDomNode("#comment", data="c")
+        for attr in SimpleDomNode.__slots__:
+            assert getattr(node, attr) == getattr(expected, attr)
+
+    def test_new_doctype_matches_constructor(self):
+        doctype = JustHTML("<!DOCTYPE html>").root.children[0].data
+        node = SimpleDomNode.new_doctype(doctype)
+        expected = SimpleDomNode("!doctype", data=doctype)
+        for attr in SimpleDomNode.__slots__:
+            assert getattr(node, attr) == getattr(expected, attr)
+
     def test_text_property_simple(self):
         node = SimpleDomNode("div")
         text = TextNode("Hello")
@@ -79,6 +92,16 @@ class TestNode(unittest.TestCase):
         root.append_child(TextNode("A"))
         assert root.to_text() == "A"
 
+    def test_to_text_single_text_child(self):
+        span = SimpleDomNode("span")
+        span.append_child(TextNode("  Hi  "))
+        assert span.to_text() == "Hi"
+        assert span.to_text(strip=False) == "  Hi  "
+
+        empty = SimpleDomNode("span")
+        empty.append_child(TextNode(""))
+        assert empty.to_text() == ""
+
     def test_to_text_empty_subtree(self):
         root = SimpleDomNode("div")
         assert root.to_text() == ""
@@ -116,6 +139,11 @@ class TestNode(unittest.TestCase):
         assert md.startswith("# Title\n\n")
         assert "Hello **world** *ok* [link](https://e.com) a\\*b" in md
 
+    def test_to_markdown_uppercase_constructed_element(self):
+        strong = ElementNode("STRONG", {}, "html")
+        strong.append_child(TextNode("x"))
+        assert strong.to_markdown() == "**x**"
+
     def test_to_markdown_code_inline_and_block(self):
         doc = JustHTML("<pre>code`here\n</pre><p>inline <code>a`b</code></p>")
         md = doc.to_markdown()
@@ -266,6 +294,18 @@ class TestNode(unittest.TestCase):
         _to_markdown_walk(span, b, preserve_whitespace=False, list_depth=0)
         assert b.finish() == "Hi"
 
+    def test_deeply_nested_text_and_markdown(self):
+        # Walks are iterative, so nesting beyond the recursion limit is fine.
+        root = ElementNode("div", {}, "html")
+        node = root
+        for _ in range(5000):
+            child = ElementNode("em", {}, "html")
+            node.append_child(child)
+            node = child
+        node.append_child(TextNode("deep"))
+        assert root.to_text() == "deep"
+        assert root.to_markdown() == "*" * 5000 + "deep" + "*" * 5000
+
     def test_insert_before(self):
         parent = SimpleDomNode("div")
         child1 = SimpleDomNode("span", attrs={"id": "1"})
@@ -524,5 +564,5 @@ class TestNode(unittest.TestCase):
 
     def test_text_node_children_and_has_child_nodes(self):
         text = TextNode("hello")
-        assert text.children == []
+        assert text.children == ()
         assert not text.has_child_nodes()
@@ -0,0 +1,78 @@
+import unittest
+
+from justhtml import JustHTML
+from justhtml.context import FragmentContext
+from justhtml.tokenizer import Tokenizer, TokenizerOpts
+
+
+class TestFragmentTokenizerOpts(unittest.TestCase):
+    def test_rawtext_fragment_default_opts(self):
+        doc = JustHTML("<b>x</b>", fragment_context=FragmentContext("textarea"))
+        assert doc.tokenizer.opts.initial_state == Tokenizer.RAWTEXT
+        assert doc.tokenizer.opts.initial_rawtext_tag == "textarea"
+        assert doc.root.to_text() == "<b>x</b>"
+
+        doc = JustHTML("<b>x</b>", fragment_context=FragmentContext("div"))
+        assert doc.tokenizer.opts.initial_state is None
+        assert doc.root.to_text() == "x"
+
+    def test_rawtext_fragment_custom_opts(self):
+        opts = TokenizerOpts(xml_coercion=True)
+        doc = JustHTML("<b>x</b>", fragment_context=FragmentContext("script"), tokenizer_opts=opts)
+        assert doc.tokenizer.opts.initial_state == Tokenizer.PLAINTEXT
+        assert doc.tokenizer.opts.xml_coercion
+        assert doc.root.to_text() == "<b>x</b>"
+
+        doc = JustHTML("<b>x</b>", fragment_context=FragmentContext("title"), tokenizer_opts=TokenizerOpts())
+        assert doc.tokenizer.opts.initial_rawtext_tag == "title"
+        assert doc.root.to_text() == "<b>x</b>"
+
+    def test_fragment_does_not_mutate_custom_opts(self):
+        opts = TokenizerOpts(exact_errors=True, discard_bom=False, initial_rawtext_tag="xmp")
+        doc = JustHTML("x", fragment_context=FragmentContext("plaintext"), tokenizer_opts=opts)
+        assert doc.tokenizer.opts is not opts
+        assert doc.tokenizer.opts.initial_state == Tokenizer.PLAINTEXT
+        assert doc.tokenizer.opts.initial_rawtext_tag == "xmp"
+        assert doc.tokenizer.opts.exact_errors
+        assert not doc.tokenizer.opts.discard_bom
+        assert opts.initial_state is None
+
+        doc = JustHTML("x", fragment_context=FragmentContext("div"), tokenizer_opts=opts)
+        assert doc.tokenizer.opts is opts
+
+    def test_default_opts_are_not_shared_between_parses(self):
+        doc = JustHTML("\ufeffx")
+        doc.tokenizer.opts.discard_bom = False
+        assert JustHTML("\ufeffx").tokenizer.opts.discard_bom
+        assert JustHTML("\ufeffx").root.to_text() == "x"
+
+        doc = JustHTML("<b>x</b>", fragment_context=FragmentContext("textarea"))
+        doc.tokenizer.opts.initial_rawtext_tag = "title"
+        doc = JustHTML("<b>x</b>", fragment_context=FragmentContext("textarea"))
+        assert doc.tokenizer.opts.initial_rawtext_tag == "textarea"
+
+    def test_opts_copy(self):
+        opts = TokenizerOpts(exact_errors=True, discard_bom=False, xml_coercion=True, initial_rawtext_tag="xmp")
+        copy = opts.copy(initial_state=Tokenizer.RAWTEXT)
+        assert copy is not opts
+        assert copy.exact_errors
+        assert not copy.discard_bom
+        assert copy.xml_coercion
+        assert copy.initial_rawtext_tag == "xmp"
+        assert copy.initial_state == Tokenizer.RAWTEXT
+        assert opts.initial_state is None
+        with self.assertRaises(TypeError):
+            opts.copy(bogus=True)
+
+    def test_fragment_context_tag_name_reassigned(self):
+        ctx = FragmentContext("div")
+        ctx.tag_name = "TEXTAREA"
+        assert ctx.tag_name == "TEXTAREA"
+        assert ctx.tag_name_lower == "textarea"
+        doc = JustHTML("<b>x</b>", fragment_context=ctx)
+        assert doc.tokenizer.opts.initial_rawtext_tag == "textarea"
+        assert doc.root.to_text() == "<b>x</b>"
+
+
+if __name__ == "__main__":
+    unittest.main()
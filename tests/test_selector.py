@@ -2,7 +2,8 @@
 
 import unittest
 
-from justhtml import JustHTML, SelectorError, matches, query
+from justhtml import JustHTML, SelectorError, SelectorIndex, matches, query
+from justhtml.node import ElementNode
 from justhtml.selector import (
     ComplexSelector,
     CompoundSelector,
@@ -13,6 +14,8 @@ from justhtml.selector import (
     SimpleSelector,
     Token,
     TokenType,
+    _parse_nth_expression,
+    parse_selector,
 )
 
 
@@ -845,6 +848,62 @@ class TestParserCoverage(SelectorTestCase):
         result = query(doc, "div")
         assert len(result) == 1
 
+    def test_parse_selector_is_cached(self):
+        assert parse_selector("div > p.intro") is parse_selector("div > p.intro")
+
+    def test_parse_selector_errors_are_not_cached(self):
+        for _ in range(2):
+            with self.assertRaises(SelectorError):
+                parse_selector("div[")
+
+    def test_tokenizer_reads_identifier_runs(self):
+        tokens = SelectorTokenizer("h2.café-1_x#日本:nth-child(2)").tokenize()
+        assert [token.value for token in tokens[:4]] == ["h2", "café-1_x", "日本", None]
+        with self.assertRaisesRegex(SelectorError, "Unexpected character '\\\\x7f' at position 1"):
+            SelectorTokenizer("a\x7fb").tokenize()
+
+    def test_tokenizer_character_classes(self):
+        tokens = SelectorTokenizer("a\t>\fb ~c\r\n, [x~=y\f]").tokenize()
+        assert [token.type for token in tokens] == [
+            TokenType.TAG,
+            TokenType.COMBINATOR,
+            TokenType.TAG,
+            TokenType.COMBINATOR,
+            TokenType.TAG,
+            TokenType.COMMA,
+            TokenType.ATTR_START,
+            TokenType.TAG,
+            TokenType.ATTR_OP,
+            TokenType.STRING,
+            TokenType.ATTR_END,
+            TokenType.EOF,
+        ]
+
+        # An attribute cut off after its name is reported as such
+        with self.assertRaisesRegex(SelectorError, "Unexpected character in attribute selector"):
+            SelectorTokenizer("[x ").tokenize()
+        with self.assertRaisesRegex(SelectorError, "Expected = after ~"):
+            SelectorTokenizer("[x~y]").tokenize()
+
+    def test_compound_selectors_are_ordered_by_selectivity(self):
+        compound = parse_selector("*[href]:first-child.x#y a").parts[0][1]
+        assert [simple.type for simple in compound.selectors] == ["id", "class", "attr", "universal", "pseudo"]
+
+        # Pseudo-classes that can raise keep their position relative to the rest
+        compound = parse_selector("[href]:bogus.x#y").parts[0][1]
+        assert [simple.type for simple in compound.selectors] == ["attr", "pseudo", "id", "class"]
+        doc = JustHTML("<p>x</p>").root
+        assert query(doc, "[href]:bogus") == []
+        with self.assertRaises(SelectorError):
+            query(doc, "p:bogus[href]")
+
+    def test_parsed_tag_names_are_interned(self):
+        doc = JustHTML("<section><p>x</p></section>").root
+        section = query(doc, "section")[0]
+        selector = parse_selector("SECTION".lower())
+        assert selector.parts[0][1].selectors[0].name is section.name
+        assert matches(section, "SECTION")
+
 
 class TestMatcherCoverage(SelectorTestCase):
     """Tests for additional matcher coverage."""
@@ -1114,6 +1173,21 @@ class TestMatcherEdgeCases(SelectorTestCase):
         # Should return False for unknown types
         assert not matcher.matches(div, "not a selector")
 
+    def test_matches_selector_subclasses(self):
+        matcher = SelectorMatcher()
+        doc = JustHTML('<html><body><div class="foo">Test</div></body></html>').root
+        div = query(doc, "div")[0]
+
+        class MyList(SelectorList):
+            pass
+
+        class MySimple(SimpleSelector):
+            pass
+
+        assert matcher.matches(div, MyList([parse_selector("div.foo")]))
+        assert matcher.matches(div, MySimple(SimpleSelector.TYPE_CLASS, name="foo"))
+        assert not matcher.matches(div, MySimple(SimpleSelector.TYPE_CLASS, name="bar"))
+
     def test_sibling_with_no_parent(self):
         matcher = SelectorMatcher()
         doc = JustHTML("<html><body><div>Test</div></body></html>").root
@@ -1149,14 +1223,14 @@ class TestMatcherEdgeCases(SelectorTestCase):
         doc = JustHTML("<html><body><ul><li>1</li></ul></body></html>").root
         li = query(doc, "li")[0]
         selector = SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="nth-child", arg="1")
-        assert matcher._matches_pseudo(li, selector)
+        assert selector.match(li, matcher)
 
     def test_nth_of_type_node_not_found(self):
         matcher = SelectorMatcher()
         doc = JustHTML("<html><body><ul><li>1</li></ul></body></html>").root
         li = query(doc, "li")[0]
         selector = SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="nth-of-type", arg="1")
-        assert matcher._matches_pseudo(li, selector)
+        assert selector.match(li, matcher)
 
     def test_matches_compound_selector_direct(self):
         matcher = SelectorMatcher()
@@ -1189,6 +1263,93 @@ class TestMatcherEdgeCases(SelectorTestCase):
         selector = SimpleSelector("unknown_type", name="test")
         assert not matcher._matches_simple(div, selector)
 
+    def test_compiled_simple_selectors(self):
+        doc = JustHTML('<html><body><div data-x="abc" class="a b">Test</div></body></html>').root
+        div = query(doc, "div")[0]
+
+        matcher = SelectorMatcher()
+
+        assert not SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="empty").match(div, matcher)
+        assert not SimpleSelector(SimpleSelector.TYPE_ATTR, name="data-x", operator="??", value="abc").match(
+            div, matcher
+        )
+        assert SimpleSelector(SimpleSelector.TYPE_TAG, name="DIV").match(div, matcher)
+        assert SimpleSelector(SimpleSelector.TYPE_CLASS, name="b").match(div, matcher)
+        assert SimpleSelector(SimpleSelector.TYPE_ATTR, name="DATA-X", operator="*=", value="b").match(div, matcher)
+        assert not SimpleSelector(SimpleSelector.TYPE_ATTR, name="data-x", operator="^=", value="").match(div, matcher)
+        assert not SimpleSelector(SimpleSelector.TYPE_ATTR, name="title", operator="$=", value="c").match(div, matcher)
+
+    def test_compound_selectors_hold_compiled_matchers(self):
+        doc = JustHTML('<html><body><div class="a">Test</div></body></html>').root
+        div = query(doc, "div")[0]
+        text = div.children[0]
+        matcher = SelectorMatcher()
+
+        compound = parse_selector("div.a").parts[0][1]
+        assert compound.matchers == tuple(simple.match for simple in compound.selectors)
+        assert matcher.matches(div, compound)
+        assert not matcher.matches(text, compound)
+        assert not matcher.matches(text, SimpleSelector(SimpleSelector.TYPE_UNIVERSAL))
+
+        # An empty compound matches anything, like all() of nothing
+        assert CompoundSelector().matchers == ()
+        assert matcher.matches(text, CompoundSelector())
+
+    def test_nth_arguments_are_parsed_once(self):
+        doc = JustHTML("<ul><li>1</li><li>2</li><li>3</li></ul>").root
+        items = query(doc, "li")
+        matcher = SelectorMatcher()
+
+        nth_child = SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="NTH-CHILD", arg="odd")
+        assert [nth_child.match(li, matcher) for li in items] == [True, False, True]
+        nth_of_type = SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="nth-of-type", arg="-n+2")
+        assert [nth_of_type.match(li, matcher) for li in items] == [True, True, False]
+
+        invalid = SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="nth-child", arg="2x")
+        assert not any(invalid.match(li, matcher) for li in items)
+        assert not matches(items[0], "li:nth-of-type(2x)")
+
+    def test_not_argument_is_parsed_once(self):
+        doc = JustHTML('<p class="x">1</p><p>2</p>').root
+        first, second = query(doc, "p")
+        matcher = SelectorMatcher()
+
+        not_x = SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="not", arg=".x, b")
+        assert not not_x.match(first, matcher)
+        assert not_x.match(second, matcher)
+        assert SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="not").match(first, matcher)
+
+        # An invalid inner selector still only fails once something is matched against it
+        assert query(JustHTML("").root, "p:not(.a[)") == []
+        with self.assertRaises(SelectorError):
+            query(doc, "p:not(.a[)")
+
+    def test_query_deeply_nested_tree(self):
+        root = ElementNode("div", {}, "html")
+        node = root
+        for _ in range(3000):
+            child = ElementNode("div", {}, "html")
+            node.append_child(child)
+            node = child
+        node.append_child(ElementNode("p", {}, "html"))
+
+        assert len(query(root, "div")) == 3000
+        assert query(root, "div > p") == [node.children[0]]
+
+    def test_class_word_matching(self):
+        doc = JustHTML('<div class="ab a-b\tcab  b">x</div>').root
+        div = query(doc, "div")[0]
+        assert matches(div, ".b")
+        assert matches(div, ".a-b")
+        assert not matches(div, ".a")
+        assert not matches(div, ".ca")
+        assert matches(div, "[class~=cab]")
+        assert matches(div, "[class~=ab]")
+        matcher = SelectorMatcher()
+        assert not SimpleSelector(SimpleSelector.TYPE_CLASS, name="ab a-b").match(div, matcher)
+        assert not SimpleSelector(SimpleSelector.TYPE_CLASS).match(div, matcher)
+        assert not SimpleSelector(SimpleSelector.TYPE_ATTR, name="class", operator="~=", value="").match(div, matcher)
+
     def test_unknown_attribute_operator(self):
         matcher = SelectorMatcher()
         doc = JustHTML('<html><body><div data-x="abc">Test</div></body></html>').root
@@ -1196,7 +1357,7 @@ class TestMatcherEdgeCases(SelectorTestCase):
 
         # Create an attribute selector with unknown operator
         selector = SimpleSelector(SimpleSelector.TYPE_ATTR, name="data-x", operator="??", value="abc")
-        assert not matcher._matches_attribute(div, selector)
+        assert not selector.match(div, matcher)
 
 
 class TestParserEdgeCases(SelectorTestCase):
@@ -1386,25 +1547,21 @@ class TestAdditionalCoverage(SelectorTestCase):
         # Lines 840, 861: Node not found in elements list
         # This is hard to trigger since we're iterating through children
         # But we test the fallthrough case
-        matcher = SelectorMatcher()
         doc = JustHTML("<html><body><ul><li>1</li><li>2</li></ul></body></html>").root
         li = query(doc, "li")[0]
         # Test that it returns correct value
-        result = matcher._matches_nth_child(li, "1")
-        assert result
-        result = matcher._matches_nth_child(li, "2")
-        assert not result
+        assert matches(li, ":nth-child(1)")
+        assert not matches(li, ":nth-child(2)")
 
     def test_nth_of_type_with_multiple_types(self):
         # Test nth-of-type with mixed element types
         doc = JustHTML("<html><body><div>1</div><span>2</span><div>3</div><span>4</span></body></html>").root
         spans = query(doc, "span")
         # First span should be nth-of-type(1)
-        matcher = SelectorMatcher()
-        assert matcher._matches_nth_of_type(spans[0], "1")
-        assert not matcher._matches_nth_of_type(spans[0], "2")
+        assert matches(spans[0], ":nth-of-type(1)")
+        assert not matches(spans[0], ":nth-of-type(2)")
         # Second span should be nth-of-type(2)
-        assert matcher._matches_nth_of_type(spans[1], "2")
+        assert matches(spans[1], ":nth-of-type(2)")
 
     def test_get_previous_sibling_not_found(self):
         # Test when node is first child (no previous sibling found)
@@ -1414,6 +1571,14 @@ class TestAdditionalCoverage(SelectorTestCase):
         result = matcher._get_previous_sibling(first_li)
         assert result is None
 
+    def test_positional_matches_reuse_sibling_lists(self):
+        doc = JustHTML("<ul>" + "<li>x</li><b>y</b>" * 50 + "</ul>").root
+        lis = query(doc, "li")
+        assert query(doc, "li:nth-child(odd)") == lis
+        assert query(doc, "li:nth-of-type(50)") == [lis[-1]]
+        assert query(doc, "b + li") == lis[1:]
+        assert query(doc, "li:last-of-type, b:first-of-type") == [query(doc, "b")[0], lis[-1]]
+
     def test_get_previous_sibling_detached_node(self):
         # Test with a node that's been detached from its parent's children list
         # This tests the defensive return None at the end
@@ -1467,15 +1632,11 @@ class TestAdditionalCoverage(SelectorTestCase):
 
     def test_nth_expression_empty(self):
         # Line 767: Empty expression
-        matcher = SelectorMatcher()
-        result = matcher._parse_nth_expression("")
-        assert result is None
+        assert _parse_nth_expression("") is None
 
     def test_nth_expression_none(self):
         # Line 767: None expression
-        matcher = SelectorMatcher()
-        result = matcher._parse_nth_expression(None)
-        assert result is None
+        assert _parse_nth_expression(None) is None
 
     def test_empty_pseudo_no_children_attr(self):
         # Test :empty when node doesn't have children attribute
@@ -1508,16 +1669,14 @@ class TestAdditionalCoverage(SelectorTestCase):
         matcher = SelectorMatcher()
         doc = JustHTML("<html><body></body></html>").root
         selector = SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="nth-child", arg="1")
-        result = matcher._matches_pseudo(doc, selector)
-        assert not result
+        assert not selector.match(doc, matcher)
 
     def test_nth_of_type_on_document_root(self):
         # Line 843: :nth-of-type on node with no parent
         matcher = SelectorMatcher()
         doc = JustHTML("<html><body></body></html>").root
         selector = SimpleSelector(SimpleSelector.TYPE_PSEUDO, name="nth-of-type", arg="1")
-        result = matcher._matches_pseudo(doc, selector)
-        assert not result
+        assert not selector.match(doc, matcher)
 
     def test_nth_of_type_invalid_expression(self):
         # Line 847: :nth-of-type with invalid expression
@@ -1539,29 +1698,25 @@ class TestAdditionalCoverage(SelectorTestCase):
         div.children = original_children
 
     def test_nth_child_detached_node(self):
-        # Line 837: Test _matches_nth_child with detached node (unreachable in normal use)
-        matcher = SelectorMatcher()
+        # Line 837: Test :nth-child with detached node (unreachable in normal use)
         doc = JustHTML("<html><body><div><p>Para</p></div></body></html>").root
         p = query(doc, "p")[0]
         div = p.parent
         # Detach node from parent's children
         original_children = div.children
         div.children = []
-        result = matcher._matches_nth_child(p, "1")
-        assert not result
+        assert not matches(p, ":nth-child(1)")
         div.children = original_children
 
     def test_nth_of_type_detached_node(self):
-        # Line 858: Test _matches_nth_of_type with detached node (unreachable in normal use)
-        matcher = SelectorMatcher()
+        # Line 858: Test :nth-of-type with detached node (unreachable in normal use)
         doc = JustHTML("<html><body><div><p>Para</p></div></body></html>").root
         p = query(doc, "p")[0]
         div = p.parent
         # Detach node from parent's children
         original_children = div.children
         div.children = []
-        result = matcher._matches_nth_of_type(p, "1")
-        assert not result
+        assert not matches(p, ":nth-of-type(1)")
         div.children = original_children
 
     def test_empty_child_without_name(self):
@@ -1582,6 +1737,46 @@ class TestAdditionalCoverage(SelectorTestCase):
         div.children = original_children
 
 
+class TestSelectorIndex(SelectorTestCase):
+    """Test repeated queries through a SelectorIndex."""
+
+    def test_index_matches_query(self):
+        html = """
+        <div id="main" class="box  wide box"><p class="x">1</p><P id="main">2</P><span>3</span></div>
+        <template><p class="x">4</p></template>
+        <ul><li>a</li><li class="x y">b</li></ul>
+        """
+        for doc in (JustHTML(html).root, self.get_simple_doc(), self.get_sibling_doc()):
+            index = SelectorIndex(doc)
+            for selector in [
+                "#main",
+                "div#main.box",
+                ".x",
+                ".box.wide > p",
+                "p",
+                "ul li + li.y",
+                "*",
+                "[id]",
+                "h1 ~ p",
+                "li:first-child",
+                "p:not(.x)",
+                "span, p.x",
+                "#missing",
+                ".missing",
+                "article",
+            ]:
+                assert index.query(selector) == query(doc, selector), selector
+
+    def test_index_errors_match_query(self):
+        doc = JustHTML("<p>x</p>").root
+        index = SelectorIndex(doc)
+        # Every element is still checked, so unsupported pseudo-classes raise
+        with self.assertRaises(SelectorError):
+            index.query(":bogus#missing")
+        with self.assertRaises(SelectorError):
+            index.query("div[")
+
+
 class TestJustHTMLMethods(unittest.TestCase):
     """Test JustHTML convenience methods that delegate to root."""
 
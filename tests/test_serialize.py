@@ -2,9 +2,6 @@ import unittest
 
 from justhtml import JustHTML
 from justhtml.serialize import (
-    _can_unquote_attr_value,
-    _choose_attr_quote,
-    _escape_attr_value,
     _escape_text,
     serialize_end_tag,
     serialize_start_tag,
@@ -108,19 +105,19 @@ class TestSerialize(unittest.TestCase):
 
         # Unquoted when safe
         assert serialize_start_tag("span", {"title": "foo"}) == "<span title=foo>"
-        assert _can_unquote_attr_value("foo<bar") is True
-        assert _can_unquote_attr_value("foo>bar") is False
-        assert _can_unquote_attr_value('foo"bar') is False
-        assert _can_unquote_attr_value("foo bar") is False
+        assert serialize_start_tag("span", {"title": "foo<bar"}) == "<span title=foo<bar>"
+        assert serialize_start_tag("span", {"title": "foo>bar"}) == '<span title="foo>bar">'
+        assert serialize_start_tag("span", {"title": "foo bar"}) == '<span title="foo bar">'
+        assert serialize_start_tag("span", {"title": "it's"}) == '<span title="it\'s">'
+        assert serialize_start_tag("span", {"title": "a&b c"}) == '<span title="a&amp;b c">'
+        assert serialize_start_tag("span", {"title": "a&b", "hidden": ""}) == "<span title=a&amp;b hidden>"
 
     def test_serialize_end_tag(self):
         assert serialize_end_tag("span") == "</span>"
 
     def test_serializer_private_helpers_none(self):
         assert _escape_text(None) == ""
-        assert _choose_attr_quote(None) == '"'
-        assert _escape_attr_value(None, '"') == ""
-        assert _can_unquote_attr_value(None) is False
+        assert serialize_start_tag("span", {"hidden": None}) == "<span hidden>"
 
     def test_mixed_content_whitespace(self):
         html = "<div>   <p></p></div>"
@@ -48,6 +48,10 @@ class TestStream(unittest.TestCase):
         expected = [("text", "abc")]
         assert events == expected
 
+        # Text that the tokenizer emits across several steps is still one event.
+        events = list(stream("a<0b\t"))
+        assert events == [("text", "a<0b\t")]
+
     def test_script_rawtext(self):
         html = "<script>console.log('<');</script>"
         events = list(stream(html))
@@ -63,3 +67,11 @@ class TestStream(unittest.TestCase):
         events = list(stream(html))
         expected = [("end", "div")]
         assert events == expected
+
+    def test_attrs_are_not_shared_between_tags(self):
+        html = '<a href="x" id="a1"><b class="y"></b><a href="z">'
+        events = list(stream(html))
+        assert events[0] == ("start", ("a", {"href": "x", "id": "a1"}))
+        assert events[1] == ("start", ("b", {"class": "y"}))
+        assert events[3] == ("start", ("a", {"href": "z"}))
+        assert events[0][1][1] is not events[3][1][1]